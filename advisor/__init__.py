@@ -4,36 +4,20 @@ Provides interview-to-report pipeline and related utilities.
 """
 
 from importlib import import_module
-
-# Eagerly create names for linters; resolve lazily to avoid import errors during partial installs.
-try:  # pragma: no cover - defensive import scaffolding
-    from . import schemas as schemas  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    schemas = None  # type: ignore
-try:  # pragma: no cover
-    from . import prompts as prompts  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    prompts = None  # type: ignore
-try:  # pragma: no cover
-    from . import pipeline as pipeline  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    pipeline = None  # type: ignore
-try:  # pragma: no cover
-    from . import figures as figures  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    figures = None  # type: ignore
-try:  # pragma: no cover
-    from . import renderer as renderer  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    renderer = None  # type: ignore
-try:  # pragma: no cover
-    from . import persist as persist  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    persist = None  # type: ignore
-try:  # pragma: no cover
-    from . import demo as demo  # type: ignore  # noqa: F401
-except Exception:  # pragma: no cover
-    demo = None  # type: ignore
+from typing import TYPE_CHECKING
+
+# Submodules resolve lazily through __getattr__ so importing advisor.schemas does not
+# pull in the pipeline/LLM stack; the names are declared here for linters only.
+if TYPE_CHECKING:  # pragma: no cover
+    from . import (  # noqa: F401
+        demo,
+        figures,
+        persist,
+        pipeline,
+        prompts,
+        renderer,
+        schemas,
+    )
 
 
 def __getattr__(name: str):
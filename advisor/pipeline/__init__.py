@@ -3,7 +3,10 @@ Advisor pipeline package.
 
 Public API:
  - run_interview_pipeline(interview: InterviewInput, df: pd.DataFrame) -> ReportBundle
+ - run_interview_pipeline_iter(interview, df) -> Iterator[PipelineEvent]
+ - memoized_pipeline(interview, df) -> ReportBundle
  - compute_data_signature(df: pd.DataFrame) -> str
+ - compute_data_fingerprint(df: pd.DataFrame) -> str
  - cache_key_for(interview: Any, df: pd.DataFrame) -> str
 
 Compatibility:
@@ -16,7 +19,12 @@ Compatibility:
 from __future__ import annotations
 
 # Re-export cache helpers
-from .cache import cache_key_for, compute_data_signature
+from .cache import (
+    cache_key_for,
+    compute_data_fingerprint,
+    compute_data_signature,
+    memoized_pipeline,
+)
 
 # Re-export stage helpers and tools for test monkeypatch compatibility
 from .imports import (  # type: ignore
@@ -29,10 +37,11 @@ from .imports import (  # type: ignore
     _stage5_recommend_cached,
     tool_query,
 )
+from .progress import PipelineEvent
 
 
-def run_interview_pipeline(interview, df):
-    """Compatibility wrapper that rebinds internals before delegating to the orchestrator."""
+def _rebind_internals():
+    """Point orchestrator/metrics/figures_wrap at the current package attributes."""
     # Local imports to avoid circular dependencies at module import time
     from . import (
         figures_wrap as _figs,  # type: ignore
@@ -62,7 +71,17 @@ def run_interview_pipeline(interview, df):
     except Exception:
         pass
 
-    return _orc.run_interview_pipeline(interview, df)
+    return _orc
+
+
+def run_interview_pipeline(interview, df):
+    """Compatibility wrapper that rebinds internals before delegating to the orchestrator."""
+    return _rebind_internals().run_interview_pipeline(interview, df)
+
+
+def run_interview_pipeline_iter(interview, df):
+    """Like run_interview_pipeline, but yields a PipelineEvent as each stage completes."""
+    return _rebind_internals().run_interview_pipeline_iter(interview, df)
 
 
 def _figures_default(df, interview, needs):
@@ -78,7 +97,11 @@ def _figures_default(df, interview, needs):
 
 __all__ = [
     "run_interview_pipeline",
+    "run_interview_pipeline_iter",
+    "PipelineEvent",
+    "memoized_pipeline",
     "compute_data_signature",
+    "compute_data_fingerprint",
     "cache_key_for",
     # Exposed for tests/backward-compat monkeypatching:
     "_figures_default",
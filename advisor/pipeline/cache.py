@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
 from typing import Any
 
 import pandas as pd
@@ -25,9 +29,80 @@ def compute_data_signature(df: pd.DataFrame) -> str:
     return f"{rows}:{total:.2f}"
 
 
+_FINGERPRINT_CACHE: dict[int, tuple[weakref.ref, tuple[int, tuple], str]] = {}
+_FINGERPRINT_CACHE_SIZE = 4
+
+
+def compute_data_fingerprint(df: pd.DataFrame) -> str:
+    """Return a content digest of df, hashed once per frame while its shape is unchanged.
+
+    Unlike compute_data_signature this distinguishes frames whose row count and amount
+    total happen to match. Falls back to the signature for unhashable cell values.
+    """
+    try:
+        shape = (len(df), tuple(df.columns))
+    except Exception:
+        return compute_data_signature(df)
+    hit = _FINGERPRINT_CACHE.get(id(df))
+    if hit is not None and hit[0]() is df and hit[1] == shape:
+        return hit[2]
+    try:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        h = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+        h.update(repr(shape[1]).encode("utf-8"))
+        value = h.hexdigest()
+    except Exception:
+        return compute_data_signature(df)
+    try:
+        ref = weakref.ref(df)
+    except TypeError:
+        return value
+    if len(_FINGERPRINT_CACHE) >= _FINGERPRINT_CACHE_SIZE:
+        _FINGERPRINT_CACHE.pop(next(iter(_FINGERPRINT_CACHE)), None)
+    _FINGERPRINT_CACHE[id(df)] = (ref, shape, value)
+    return value
+
+
 def cache_key_for(interview: Any, df: pd.DataFrame) -> str:
     try:
         ihash = interview.stable_hash()
     except Exception:
         ihash = stable_hash_for_obj(_safe_to_dict(interview))
-    return f"{ihash}::{compute_data_signature(df)}"
+    return f"{ihash}::{compute_data_fingerprint(df)}"
+
+
+def report_id_for_key(key: str) -> str:
+    """Return the progress/report id derived from a pipeline cache key."""
+    return f"RPT-{stable_hash_for_obj({'k': key})[:8].upper()}"
+
+
+def report_id_for(interview: Any, df: pd.DataFrame) -> str:
+    """Return the progress/report id the pipeline uses for this (interview, df) pair."""
+    return report_id_for_key(cache_key_for(interview, df))
+
+
+_RESULT_LOCK = threading.Lock()
+_RESULT_CACHE: OrderedDict[str, Any] = OrderedDict()
+_RESULT_CACHE_SIZE = 8
+
+
+def memoized_pipeline(interview: Any, df: pd.DataFrame) -> Any:
+    """Run the pipeline, reusing the ReportBundle of an identical earlier run.
+
+    Keyed by cache_key_for, so resubmitting the same interview against the same data
+    returns immediately instead of recomputing metrics and figures.
+    """
+    # Resolve through the package so monkeypatched stages/tools are honored
+    from . import run_interview_pipeline
+
+    key = cache_key_for(interview, df)
+    with _RESULT_LOCK:
+        if key in _RESULT_CACHE:
+            _RESULT_CACHE.move_to_end(key)
+            return _RESULT_CACHE[key]
+    report = run_interview_pipeline(interview, df)
+    with _RESULT_LOCK:
+        _RESULT_CACHE[key] = report
+        while len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+    return report
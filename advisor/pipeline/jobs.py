@@ -0,0 +1,100 @@
+"""Background execution of the advisor pipeline.
+
+Streamlit reruns the page script on every interaction, so a multi-minute pipeline call
+inside the script blocks the session. Jobs are submitted to a small process-wide thread
+pool keyed by report id (the same id the progress store uses); pages poll the job state
+on each rerun and render the bundle once it is finished.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import pandas as pd
+
+from .cache import memoized_pipeline, report_id_for
+from .progress import _LOCK as _PROGRESS_LOCK, _PROGRESS_STATE
+
+_MAX_WORKERS = 2
+
+_JOBS_LOCK = threading.Lock()
+_JOBS: dict[str, Future] = {}
+_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="advisor")
+    return _EXECUTOR
+
+
+def _run_job(report_id: str, interview: Any, df: pd.DataFrame) -> Any:
+    try:
+        return memoized_pipeline(interview, df)
+    except Exception as e:
+        with _PROGRESS_LOCK:
+            state = _PROGRESS_STATE.setdefault(report_id, {})
+            state.update({"status": "error", "message": str(e)})
+        raise
+
+
+def submit_pipeline_job(interview: Any, df: pd.DataFrame) -> str:
+    """Start the pipeline in the background and return its report id.
+
+    Resubmitting identical inputs while a job is running (or after it finished) reuses
+    that job; a failed job is replaced by a fresh one.
+    """
+    report_id = report_id_for(interview, df)
+    with _JOBS_LOCK:
+        fut = _JOBS.get(report_id)
+        if fut is None or (fut.done() and fut.exception() is not None):
+            _JOBS[report_id] = _executor().submit(_run_job, report_id, interview, df)
+    return report_id
+
+
+def get_job_status(report_id: str) -> str:
+    """Return 'missing', 'running', 'finished' or 'failed' for a submitted job."""
+    with _JOBS_LOCK:
+        fut = _JOBS.get(report_id)
+    if fut is None:
+        return "missing"
+    if not fut.done():
+        return "running"
+    return "failed" if fut.exception() is not None else "finished"
+
+
+def get_job_result(report_id: str) -> Any | None:
+    """Return the finished job's ReportBundle, or None if it is not available."""
+    with _JOBS_LOCK:
+        fut = _JOBS.get(report_id)
+    if fut is None or not fut.done() or fut.exception() is not None:
+        return None
+    return fut.result()
+
+
+def get_job_error(report_id: str) -> str | None:
+    """Return the failed job's error message, if any."""
+    with _JOBS_LOCK:
+        fut = _JOBS.get(report_id)
+    if fut is None or not fut.done():
+        return None
+    err = fut.exception()
+    return str(err) if err is not None else None
+
+
+def forget_job(report_id: str) -> None:
+    """Drop a job handle once its result has been collected."""
+    with _JOBS_LOCK:
+        _JOBS.pop(report_id, None)
+
+
+__all__ = [
+    "submit_pipeline_job",
+    "get_job_status",
+    "get_job_result",
+    "get_job_error",
+    "forget_job",
+]
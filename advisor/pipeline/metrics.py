@@ -17,6 +17,9 @@ from .imports import (
 )
 from .json_utils import _json_dumps_stable
 
+# Planned metrics are independent tool_query round trips; overlap a few of them
+_METRIC_MAX_WORKERS = 4
+
 
 def _ensure_funder_metric(
     df: pd.DataFrame, needs: StructuredNeeds, mrs: list[MetricRequest]
@@ -377,6 +380,16 @@ def _fallback_metric_analysis(df: pd.DataFrame, tool: str, params: dict[str, Any
         return f"| Error | Details |\n|-------|---------|\n| Status | Analysis failed |\n| Tool | {tool} |\n| Message | {str(e)[:50]} |"
 
 
+def _execute_metrics(df: pd.DataFrame, pre_prompt: str, items: list[Any]) -> list[str]:
+    """Run _execute_metric for each planned item concurrently, preserving plan order."""
+    if len(items) < 2:
+        return [_execute_metric(df, pre_prompt, it.tool, it.params) for it in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(_METRIC_MAX_WORKERS, len(items))) as ex:
+        return list(ex.map(lambda it: _execute_metric(df, pre_prompt, it.tool, it.params), items))
+
+
 def _collect_datapoints(df: pd.DataFrame, interview: Any, plan) -> list[DataPoint]:
     pre = _build_pre_prompt(df, interview)
     datapoints: list[DataPoint] = []
@@ -385,8 +398,8 @@ def _collect_datapoints(df: pd.DataFrame, interview: Any, plan) -> list[DataPoin
     if needs_like is None and hasattr(plan, "narrative_outline"):
         # not available; leave None
         pass
-    for item in plan.metric_requests:
-        content = _execute_metric(df, pre, item.tool, item.params)
+    items = list(plan.metric_requests)
+    for item, content in zip(items, _execute_metrics(df, pre, items), strict=True):
         # Automatic fallback for targeted focus when SQL returns empty
         if item.tool == "df_sql_select" and _is_no_match(content):
             try:
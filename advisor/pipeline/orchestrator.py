@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any, cast
 
 import pandas as pd
 
-from .cache import cache_key_for
+from .cache import cache_key_for, report_id_for_key
 from .convert import _safe_to_dict
 from .figures_wrap import _figures_default
 from .funders import _coerce_funder_candidate, _derive_grounded_dp_ids, _fallback_funder_candidates
@@ -27,10 +28,15 @@ from .imports import (
     _stage4_synthesize_cached,
     _stage5_recommend_cached,
     _tokens_lower,
-    stable_hash_for_obj,
 )
 from .metrics import _collect_datapoints, _ensure_funder_metric
-from .progress import _persist_report, _push_progress, create_progress_callback
+from .progress import (
+    PipelineEvent,
+    _persist_report,
+    _push_partial,
+    _push_progress,
+    create_progress_callback,
+)
 
 
 def _coerce_search_query(it: Any) -> SearchQuery | None:
@@ -68,31 +74,68 @@ def _coerce_search_query(it: Any) -> SearchQuery | None:
 
 def run_interview_pipeline(interview: InterviewInput, df: pd.DataFrame) -> ReportBundle:
     """Run the staged advisor pipeline and return a ReportBundle."""
+    report: ReportBundle | None = None
+    for evt in run_interview_pipeline_iter(interview, df):
+        report = evt.report or report
+    return cast(ReportBundle, report)
+
+
+_STAGE_COUNT = 7
+
+
+def _stage_event(stage: int, message: str, partial_markdown: str = "") -> PipelineEvent:
+    return PipelineEvent(
+        stage=stage,
+        pct=(stage + 1) / _STAGE_COUNT,
+        message=message,
+        partial_markdown=partial_markdown,
+    )
+
+
+def run_interview_pipeline_iter(
+    interview: InterviewInput, df: pd.DataFrame
+) -> Iterator[PipelineEvent]:
+    """Run the staged advisor pipeline, yielding a PipelineEvent as each stage completes.
+
+    The last event carries the finished ReportBundle in ``report``.
+    """
     key = cache_key_for(interview, df)
-    report_id = f"RPT-{stable_hash_for_obj({'k': key})[:8].upper()}"
+    report_id = report_id_for_key(key)
 
     # Create progress callback for UI updates
     progress_callback = create_progress_callback(report_id)
 
+    interview_dict = _safe_to_dict(interview)
+    # Normalization does not depend on the intake summary; overlap the two LLM calls
+    from concurrent.futures import ThreadPoolExecutor
+
+    ex = ThreadPoolExecutor(max_workers=1)
+    f_needs = ex.submit(_stage1_normalize_cached, key, interview_dict)
+    ex.shutdown(wait=False)
+
     # Stage 0: Intake summary
     _push_progress(report_id, "Stage 0: Summarizing intake")
     progress_callback(0, "running", "Starting intake summary")
-    interview_dict = _safe_to_dict(interview)
     intake_summary = _stage0_intake_summary_cached(key, interview_dict)
     progress_callback(0, "completed", "Finished intake summary")
+    if intake_summary:
+        _push_partial(report_id, str(intake_summary))
+    yield _stage_event(0, "Finished intake summary", str(intake_summary or ""))
 
     # Stage 1: Normalize -> StructuredNeeds
     _push_progress(report_id, "Stage 1: Normalizing interview into StructuredNeeds")
     progress_callback(1, "running", "Analyzing your requirements")
-    needs_dict = _stage1_normalize_cached(key, interview_dict)
+    needs_dict = f_needs.result()
     needs = StructuredNeeds(**needs_dict)
     progress_callback(1, "completed", "Finished analyzing requirements")
+    yield _stage_event(1, "Finished analyzing requirements")
 
     # Stage 2: Plan
     _push_progress(report_id, "Stage 2: Planning analysis (tools)")
     progress_callback(2, "running", "Planning analysis approach")
     plan_dict = _stage2_plan_cached(key, _safe_to_dict(needs))
     progress_callback(2, "completed", "Finished planning approach")
+    yield _stage_event(2, "Finished planning approach")
 
     metric_requests: list[MetricRequest] = []
     for it in plan_dict.get("metric_requests", []):
@@ -124,6 +167,7 @@ def run_interview_pipeline(interview: InterviewInput, df: pd.DataFrame) -> Repor
         df_for_metrics = df
     datapoints = _collect_datapoints(df_for_metrics, interview, plan)
     progress_callback(3, "completed", "Finished calculations")
+    yield _stage_event(3, "Finished calculations")
 
     # Stage 4 + 5: run section synthesis and recommendations in parallel to reduce latency
     _push_progress(report_id, "Stage 4: Synthesizing report sections")
@@ -240,6 +284,8 @@ def run_interview_pipeline(interview: InterviewInput, df: pd.DataFrame) -> Repor
             rec = Recommendations()
         progress_callback(5, "completed", "Finished identifying funders")
 
+    yield _stage_event(5, "Finished writing recommendations and identifying funders")
+
     # Post-process: drop placeholder/zero-score candidates before fallback
     try:
 
@@ -419,7 +465,9 @@ def run_interview_pipeline(interview: InterviewInput, df: pd.DataFrame) -> Repor
     _persist_report(report_id, bundle)
     _push_progress(report_id, "Pipeline complete")
     progress_callback(6, "completed", "Analysis complete!")
-    return bundle
+    evt = _stage_event(6, "Analysis complete!")
+    evt.report = bundle
+    yield evt
 
 
-__all__ = ["run_interview_pipeline"]
+__all__ = ["run_interview_pipeline", "run_interview_pipeline_iter"]
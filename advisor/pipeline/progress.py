@@ -1,4 +1,5 @@
 import threading
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
@@ -6,9 +7,23 @@ _LOCK = threading.Lock()
 _PROGRESS_STATE: dict[str, dict[str, Any]] = {}
 _PROGRESS_LOGS: dict[str, list[str]] = {}
 _REPORT_STORE: dict[str, "ReportBundle"] = {}
+# Stores are process-wide and shared by all sessions; keep only the most recent reports
+_MAX_TRACKED_REPORTS = 32
 
 from .imports import ReportBundle
 
+
+@dataclass
+class PipelineEvent:
+    """Emitted by run_interview_pipeline_iter after each stage finishes."""
+
+    stage: int
+    pct: float
+    message: str
+    partial_markdown: str = ""
+    report: "ReportBundle | None" = None
+
+
 # Stage definitions for progress tracking
 STAGES = [
     {
@@ -76,8 +91,20 @@ def get_stage_info(backend_name: str) -> dict | None:
     return next((s for s in STAGES if s["backend_name"].lower() in lowered), None)
 
 
+def _evict_old_reports() -> None:
+    """Drop the oldest report ids beyond _MAX_TRACKED_REPORTS (caller holds _LOCK)."""
+    for store in (_PROGRESS_STATE, _PROGRESS_LOGS, _REPORT_STORE):
+        while len(store) > _MAX_TRACKED_REPORTS:
+            store.pop(next(iter(store)))
+
+
 def create_progress_callback(report_id: str) -> callable:
     """Create a callback function that updates the progress store (thread-safe)."""
+    # A (re)started run counts as the newest report for eviction purposes
+    with _LOCK:
+        for store in (_PROGRESS_STATE, _PROGRESS_LOGS, _REPORT_STORE):
+            if report_id in store:
+                store[report_id] = store.pop(report_id)
 
     def update_progress(stage_index: int, status: str, message: str = "") -> None:
         data = {
@@ -90,6 +117,7 @@ def create_progress_callback(report_id: str) -> callable:
             existing = _PROGRESS_STATE.get(report_id, {})
             existing.update(data)
             _PROGRESS_STATE[report_id] = existing
+            _evict_old_reports()
 
     return update_progress
 
@@ -134,12 +162,21 @@ def _push_progress(report_id: str, message: str) -> None:
                     }
                 )
             _PROGRESS_STATE[report_id] = state
+        _evict_old_reports()
+
+
+def _push_partial(report_id: str, markdown: str) -> None:
+    """Publish markdown that is ready before the full report (thread-safe)."""
+    with _LOCK:
+        _PROGRESS_STATE.setdefault(report_id, {})["partial_markdown"] = markdown
 
 
 def _persist_report(report_id: str, report: ReportBundle) -> None:
     """Persist the final report in an in-memory store (thread-safe)."""
     with _LOCK:
+        _REPORT_STORE.pop(report_id, None)
         _REPORT_STORE[report_id] = report
+        _evict_old_reports()
 
 
 def get_progress_log(report_id: str) -> list[str]:
@@ -382,6 +382,9 @@ def _clean_interpretation_text(text: str, for_markdown: bool = True) -> str:
 
 _def_md_specials = r"([\\`*_{}\[\]()#+\-\.!|>])"
 
+# Single-character rewrites for narrative Markdown (see _clean_narrative_md)
+_NARRATIVE_CHAR_TBL = str.maketrans({"\u00a0": " ", "\u202f": " ", "$": "\\$"})
+
 
 def _clean_narrative_md(text: str) -> str:
     """
@@ -396,17 +399,15 @@ def _clean_narrative_md(text: str) -> str:
     except Exception:
         t = str(text)
 
-    # NBSP variants to normal spaces
-    t = t.replace("\u00a0", " ").replace("\u202f", " ")
+    # NBSP variants to normal spaces, and escape dollar signs to prevent LaTeX rendering in
+    # Streamlit, in one translate pass
+    t = t.translate(_NARRATIVE_CHAR_TBL)
 
     # Do NOT force spaces after commas inside numbers; only add a space after a comma when the next char is non-digit and non-space
     t = re.sub(r",(?=\S)(?=[^0-9])", ", ", t)
 
     # Avoid altering dashes around words; leave as-is to prevent odd spacing
 
-    # Escape dollar signs to prevent LaTeX rendering in Streamlit
-    t = re.sub(r"\$", r"\\$", t)
-
     # Escape underscores/asterisks between word chars to prevent accidental markdown italics/bold
     t = re.sub(r"(?<=\w)_(?=\w)", r"\\_", t)
     t = re.sub(r"(?<=\w)\*(?=\w)", r"\\*", t)
@@ -107,6 +107,15 @@ def get_model_name(default: str = "gpt-5-mini") -> str:
     return _get_value("OPENAI_MODEL", default) or default
 
 
+@cache
+def get_preprocess_cache_dir() -> str | None:
+    """
+    Return directory for on-disk Parquet caching of preprocessed grants, or None (disabled).
+    Key: GS_PREPROCESS_CACHE_DIR
+    """
+    return _get_value("GS_PREPROCESS_CACHE_DIR")
+
+
 @cache
 def is_feature_enabled(flag_name: str, default: bool = False) -> bool:
     """
@@ -186,6 +195,7 @@ def refresh_cache() -> None:
     get_openai_api_key.cache_clear()
     get_candid_key.cache_clear()
     get_model_name.cache_clear()
+    get_preprocess_cache_dir.cache_clear()
     is_feature_enabled.cache_clear()
     feature_flags.cache_clear()
 
@@ -197,6 +207,7 @@ __all__ = [
     "get_openai_api_key",
     "get_candid_key",
     "get_model_name",
+    "get_preprocess_cache_dir",
     "is_feature_enabled",
     "is_enabled",
     "require_flag",
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
@@ -274,32 +275,44 @@ def create_newbie_friendly_page(df: pd.DataFrame, page_type: str):
 
 
 # === DEMO ===
+def _tiled_categorical(pattern: list[str], reps: int) -> pd.Categorical:
+    """Repeat a short value pattern as dictionary-encoded codes (no per-row strings)."""
+    codes, categories = pd.factorize(np.asarray(pattern))
+    return pd.Categorical.from_codes(np.tile(codes, reps), categories=categories)
+
+
 if __name__ == "__main__":
     # Create sample data for demo
     sample_data = pd.DataFrame(
         {
-            "grant_key": range(1, 101),
-            "funder_name": [
-                "Community Foundation",
-                "Local Arts Council",
-                "City Grant Program",
-                "State Agency",
-                "Corporate Giving",
-            ]
-            * 20,
-            "funder_type": [
-                "Foundation",
-                "Community Foundation",
-                "Government",
-                "Government",
-                "Corporate",
-            ]
-            * 20,
-            "recip_name": ["Library", "School", "Nonprofit", "Hospital", "Museum"] * 20,
-            "amount_usd": [5000, 15000, 25000, 50000, 100000] * 20,
-            "grant_subject_tran": ["Education", "Arts", "Community", "Health", "Culture"] * 20,
-            "grant_geo_area_tran": ["Local", "Regional", "State", "National", "Local"] * 20,
-            "year_issued": [2023, 2024] * 50,
+            "grant_key": np.arange(1, 101, dtype=np.int32),
+            "funder_name": _tiled_categorical(
+                [
+                    "Community Foundation",
+                    "Local Arts Council",
+                    "City Grant Program",
+                    "State Agency",
+                    "Corporate Giving",
+                ],
+                20,
+            ),
+            "funder_type": _tiled_categorical(
+                ["Foundation", "Community Foundation", "Government", "Government", "Corporate"],
+                20,
+            ),
+            "recip_name": _tiled_categorical(
+                ["Library", "School", "Nonprofit", "Hospital", "Museum"], 20
+            ),
+            "amount_usd": np.tile(
+                np.array([5000, 15000, 25000, 50000, 100000], dtype=np.int32), 20
+            ),
+            "grant_subject_tran": _tiled_categorical(
+                ["Education", "Arts", "Community", "Health", "Culture"], 20
+            ),
+            "grant_geo_area_tran": _tiled_categorical(
+                ["Local", "Regional", "State", "National", "Local"], 20
+            ),
+            "year_issued": np.tile(np.array([2023, 2024], dtype=np.int32), 50),
         }
     )
 
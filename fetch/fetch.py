@@ -1,10 +1,18 @@
 import json
 import os
+import re
+import sys
 import time
 
 import requests
 from tqdm import tqdm
 
+# Optional faster JSON codec; stdlib json is used when orjson is not installed
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
 # Prefer centralized config for secrets (works when run via package or as script)
 try:
     from GrantScope import config  # when executed via package context
@@ -14,6 +22,93 @@ except Exception:
     except Exception:
         config = None  # type: ignore
 
+# CLI input tokenization/validation patterns
+_CSV_RE = re.compile(r"\s*,\s*")
+_INT_RE = re.compile(r"\s*[+-]?\d+\s*")
+
+_TRANSACTIONS_URL = "https://api.candid.org/grants/v1/transactions"
+
+# Pooled HTTP session so page fetches reuse one keep-alive connection
+_SESSION = requests.Session()
+
+# First successfully resolved Candid API key; reused for every page fetch
+_CACHED_KEY: str | None = None
+
+
+def _resolve_candid_key() -> str | None:
+    """
+    Resolve the Candid API key once and memoize the first successful result.
+
+    Precedence follows centralized config (st.secrets > env > .env), falling back to
+    the CANDID_API_KEY environment variable when config is unavailable.
+    """
+    global _CACHED_KEY
+    if _CACHED_KEY:
+        return _CACHED_KEY
+
+    candid_key: str | None = None
+    if config is not None:
+        try:
+            candid_key = config.get_candid_key()
+        except Exception:
+            candid_key = None
+    # Fallback to environment if config is unavailable
+    if not candid_key:
+        candid_key = os.getenv("CANDID_API_KEY")
+
+    if candid_key:
+        _CACHED_KEY = candid_key
+    return candid_key
+
+
+def reset_candid_key_cache() -> None:
+    """Forget the memoized Candid API key (e.g., after rotating credentials)."""
+    global _CACHED_KEY
+    _CACHED_KEY = None
+
+
+def _parse_json(content: bytes):
+    """Decode a JSON response body, preferring orjson when available."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _write_json(path: str, payload) -> None:
+    """Write payload as indented JSON, preferring orjson when available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def build_query_suffix(
+    year_range, dollar_range, subjects, populations, locations, transaction_types
+) -> str:
+    """
+    Build the filter portion of the transactions URL (everything after ``page=N``).
+
+    Filters are constant across pages, so callers fetching many pages should build
+    this once and pass it to get_grants_transactions via ``query_suffix``.
+    """
+    start_year, end_year = year_range
+    min_amt, max_amt = dollar_range
+    return (
+        f"&location={','.join(locations)}"
+        f"&geo_id_type=geonameid"
+        f"&location_type=area_served"
+        f"&year={','.join(map(str, range(start_year, end_year + 1)))}"
+        f"&subject={','.join(subjects)}"
+        f"&population={','.join(populations)}"
+        f"&support="
+        f"&transaction={','.join(transaction_types)}"
+        f"&recip_id=&funder_id=&include_gov=yes"
+        f"&min_amt={min_amt}&max_amt={max_amt}"
+        f"&sort_by=year_issued&sort_order=desc&format=json"
+    )
+
 
 def get_grants_transactions(
     page_number,
@@ -26,6 +121,7 @@ def get_grants_transactions(
     retries: int = 3,
     backoff: float = 1.5,
     timeout: int = 30,
+    query_suffix: str | None = None,
 ):
     """
     Fetch a page of grants transactions from Candid API with basic backoff/validation.
@@ -38,6 +134,8 @@ def get_grants_transactions(
         retries: number of retry attempts for transient errors (e.g., 429).
         backoff: base backoff seconds; multiplied exponentially per attempt.
         timeout: HTTP request timeout in seconds.
+        query_suffix: prebuilt filter string from build_query_suffix(); built from the
+            filter arguments when omitted.
 
     Raises:
         RuntimeError for missing/invalid API key or unrecoverable HTTP errors.
@@ -46,36 +144,13 @@ def get_grants_transactions(
     Returns:
         Parsed JSON dict from the API response.
     """
-    start_year, end_year = year_range
-    min_amt, max_amt = dollar_range
-
-    url = (
-        f"https://api.candid.org/grants/v1/transactions?"
-        f"page={page_number}"
-        f"&location={','.join(locations)}"
-        f"&geo_id_type=geonameid"
-        f"&location_type=area_served"
-        f"&year={','.join(map(str, range(start_year, end_year + 1)))}"
-        f"&subject={','.join(subjects)}"
-        f"&population={','.join(populations)}"
-        f"&support="
-        f"&transaction={','.join(transaction_types)}"
-        f"&recip_id=&funder_id=&include_gov=yes"
-        f"&min_amt={min_amt}&max_amt={max_amt}"
-        f"&sort_by=year_issued&sort_order=desc&format=json"
-    )
-
-    # Resolve API key with precedence via centralized config (st.secrets > env > .env)
-    candid_key: str | None = None
-    if config is not None:
-        try:
-            candid_key = config.get_candid_key()
-        except Exception:
-            candid_key = None
-    # Fallback to environment if config is unavailable
-    if not candid_key:
-        candid_key = os.getenv("CANDID_API_KEY")
+    if query_suffix is None:
+        query_suffix = build_query_suffix(
+            year_range, dollar_range, subjects, populations, locations, transaction_types
+        )
+    url = f"{_TRANSACTIONS_URL}?page={page_number}{query_suffix}"
 
+    candid_key = _resolve_candid_key()
     if not candid_key:
         raise RuntimeError(
             "Missing required configuration: CANDID_API_KEY. "
@@ -86,13 +161,18 @@ def get_grants_transactions(
         "accept": "application/json",
         "Subscription-Key": candid_key,
     }
+    # Prepare once through the session so its default headers (User-Agent,
+    # Accept-Encoding) apply; retries resend it without re-encoding the URL
+    request = _SESSION.prepare_request(requests.Request("GET", url, headers=headers))
+    # Honor REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE and proxy env vars as requests.get would
+    send_settings = _SESSION.merge_environment_settings(request.url, {}, None, None, None)
 
     # Normalize retry count
     retries = max(0, int(retries))
     attempt = 0
     while True:
         try:
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = _SESSION.send(request, timeout=timeout, **send_settings)
 
             # Explicit handling for common failures
             if response.status_code == 401:
@@ -112,9 +192,14 @@ def get_grants_transactions(
                     "Reduce request rate or try again later."
                 )
 
+            # Other client errors (bad filters, unknown ids) are permanent; fail fast
+            status = response.status_code
+            if 400 <= status < 500 and status != 408:
+                raise RuntimeError(f"Client error {status} from Candid API: {response.text[:200]}")
+
             # Raise for other HTTP errors
             response.raise_for_status()
-            return response.json()
+            return _parse_json(response.content)
 
         except requests.exceptions.RequestException as e:
             if attempt < retries:
@@ -126,24 +211,40 @@ def get_grants_transactions(
 
 
 def validate_input(value, value_type, min_value=None, max_value=None):
-    try:
-        parsed_value = value_type(value)
-        if min_value is not None and parsed_value < min_value:
-            raise ValueError(f"Value should be greater than or equal to {min_value}")
-        if max_value is not None and parsed_value > max_value:
-            raise ValueError(f"Value should be less than or equal to {max_value}")
-        return parsed_value
-    except ValueError as e:
-        raise ValueError(f"Invalid input: {e}")
+    if value_type is int and isinstance(value, str) and _INT_RE.fullmatch(value):
+        # Common case for CLI prompts: plain integers parse without the exception path
+        parsed_value = int(value)
+    else:
+        try:
+            parsed_value = value_type(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid input: {e}")
+    if min_value is not None and parsed_value < min_value:
+        raise ValueError(f"Invalid input: Value should be greater than or equal to {min_value}")
+    if max_value is not None and parsed_value > max_value:
+        raise ValueError(f"Invalid input: Value should be less than or equal to {max_value}")
+    return parsed_value
+
+
+def split_csv(text: str) -> list[str]:
+    """Split comma-separated CLI input, trimming whitespace and dropping empty entries."""
+    return [token for token in _CSV_RE.split(text.strip()) if token]
 
 
 def get_unique_file_name(file_name):
-    base_name, extension = os.path.splitext(file_name)
+    dirname = os.path.dirname(file_name)
+    try:
+        # One directory listing instead of a stat per candidate name
+        existing = set(os.listdir(dirname or "."))
+    except OSError:
+        existing = set()
+    base_name, extension = os.path.splitext(os.path.basename(file_name))
+    candidate = base_name + extension
     counter = 1
-    while os.path.exists(file_name):
-        file_name = f"{base_name}_{counter}{extension}"
+    while candidate in existing:
+        candidate = f"{base_name}_{counter}{extension}"
         counter += 1
-    return file_name
+    return os.path.join(dirname, candidate)
 
 
 def main():
@@ -172,16 +273,16 @@ def main():
         )
         dollar_range = (min_amt, max_amt)
 
-        subjects = input("Enter the subjects (comma-separated, e.g., SJ02,SJ05): ").split(",")
-        populations = input(
-            "Enter the populations (comma-separated, e.g., PA010000,PC040000): "
-        ).split(",")
-        locations = input(
-            "Enter the locations (comma-separated geonameid, e.g., 4671654,4736286): "
-        ).split(",")
-        transaction_types = input(
-            "Enter the transaction types (comma-separated, e.g., TA,TG): "
-        ).split(",")
+        subjects = split_csv(input("Enter the subjects (comma-separated, e.g., SJ02,SJ05): "))
+        populations = split_csv(
+            input("Enter the populations (comma-separated, e.g., PA010000,PC040000): ")
+        )
+        locations = split_csv(
+            input("Enter the locations (comma-separated geonameid, e.g., 4671654,4736286): ")
+        )
+        transaction_types = split_csv(
+            input("Enter the transaction types (comma-separated, e.g., TA,TG): ")
+        )
 
         num_pages = input("Enter the number of pages to retrieve (or 'all' for all pages): ")
         if num_pages.lower() == "all":
@@ -194,9 +295,24 @@ def main():
 
         all_grants = []
         page_number = 1
+        total_pages = None
+        progress_bar = None
+
+        # Space request starts `delay` seconds apart; fetch latency counts toward the gap
+        next_allowed = time.monotonic()
+
+        # Filters are fixed for the whole run; only the page number changes per request
+        query_suffix = build_query_suffix(
+            year_range, dollar_range, subjects, populations, locations, transaction_types
+        )
 
         print("Fetching grants data...")
         while True:
+            now = time.monotonic()
+            if now < next_allowed:
+                time.sleep(next_allowed - now)
+            next_allowed = time.monotonic() + delay
+
             grants_data = get_grants_transactions(
                 page_number,
                 year_range,
@@ -205,13 +321,23 @@ def main():
                 populations,
                 locations,
                 transaction_types,
+                query_suffix=query_suffix,
             )
             all_grants.extend(grants_data["grants"])
 
-            total_pages = grants_data["total_pages"]
-            progress_bar = tqdm(
-                total=total_pages, unit="page", desc="Progress", initial=page_number
-            )
+            # total_pages is only known after the first response; build the bar once
+            if progress_bar is None:
+                total_pages = grants_data["total_pages"]
+                # Repaint at most once a second; skip the bar entirely when not on a tty
+                progress_bar = tqdm(
+                    total=total_pages,
+                    unit="page",
+                    desc="Progress",
+                    mininterval=1.0,
+                    miniters=1,
+                    disable=not sys.stderr.isatty(),
+                )
+            progress_bar.update(1)
 
             if (
                 num_pages is None
@@ -222,13 +348,11 @@ def main():
                 break
 
             page_number += 1
-            progress_bar.update(1)
-            time.sleep(delay)  # Pause for required delay time
 
-        progress_bar.close()
+        if progress_bar is not None:
+            progress_bar.close()
 
-        with open(output_file, "w") as f:
-            json.dump({"grants": all_grants}, f, indent=2)
+        _write_json(output_file, {"grants": all_grants})
 
         print(f"Grants data saved to {output_file}")
         print("Thank you for using the Candid API Grants Data Fetcher!")
@@ -1,8 +1,109 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 # === STREAMLIT GRANT NEWBIE ENHANCEMENT PACKAGE ===
 
+# User-facing budget buckets mapped to (min, max) USD bounds
+BUDGET_RANGES = {
+    "Under $5,000": (0, 5000),
+    "$5,000 - $25,000": (5000, 25000),
+    "$25,000 - $100,000": (25000, 100000),
+    "$100,000 - $500,000": (100000, 500000),
+    "Over $500,000": (500000, float("inf")),
+}
+
+
+# Beneficiary choices offered by guided_project_planner
+_BENEFICIARY_OPTIONS = [
+    "Children and youth",
+    "Seniors",
+    "Low-income families",
+    "Immigrant communities",
+    "People with disabilities",
+    "The environment",
+    "Small businesses",
+    "Other",
+]
+
+# Static sample timeline shown by timeline_advisor (built once at import)
+_TIMELINE_DF = pd.DataFrame(
+    {
+        "Week": ["1-2", "3-4", "5-6", "7-8", "9-10", "11-12"],
+        "Focus": ["Research", "Outreach", "Writing", "Review", "Submit", "Follow up"],
+        "Activities": [
+            "Find 20 potential funders",
+            "Contact top 10 foundations",
+            "Write 3 grant proposals",
+            "Get feedback and revise",
+            "Submit applications",
+            "Follow up with funders",
+        ],
+    }
+)
+
+# Static stories rendered by success_stories_section
+_SUCCESS_STORIES = [
+    {
+        "title": "Library Gets $50K for After-School Program",
+        "person": "Sarah, Librarian",
+        "story": "I thought grants were only for big organizations. GrantScope helped me find 5 local foundations that fund education programs. I got $50,000 to create an after-school reading program!",
+        "key_to_success": "Started small - applied for $5,000 first, then used that success to get larger grants",
+    },
+    {
+        "title": "Community Garden Gets $25K Funding",
+        "person": "Mike, Volunteer Coordinator",
+        "story": "We wanted to build a community garden but had no money. The timeline advisor showed us we needed 6 months, not 2. We followed the plan and got $25,000 from 3 different funders!",
+        "key_to_success": "Applied to multiple funders with the same project - increased our odds",
+    },
+]
+
+# Friendly styling injected by main()
+_CSS = """
+    <style>
+    .stButton > button {
+        background-color: #4CAF50;
+        color: white;
+        font-weight: bold;
+        border-radius: 20px;
+        padding: 10px 20px;
+        border: none;
+    }
+    .stButton > button:hover {
+        background-color: #45a049;
+    }
+    .stInfo {
+        background-color: #e8f4f8;
+        border-left: 5px solid #2196F3;
+        padding: 15px;
+        border-radius: 5px;
+    }
+    .stSuccess {
+        background-color: #d4edda;
+        border-left: 5px solid #28a745;
+        padding: 15px;
+        border-radius: 5px;
+    }
+    .stWarning {
+        background-color: #fff3cd;
+        border-left: 5px solid #ffc107;
+        padding: 15px;
+        border-radius: 5px;
+    }
+    </style>
+    """
+
+
+@st.cache_data(show_spinner=False)
+def _budget_stats(df: pd.DataFrame) -> tuple[float, float]:
+    """Return (median, 75th percentile) of amount_usd in a single quantile pass."""
+    amt = df["amount_usd"].to_numpy(dtype=np.float64, na_value=np.nan)
+    amt = amt[~np.isnan(amt)]
+    if amt.size == 0:
+        return float("nan"), float("nan")
+    median_grant, p75_grant = np.quantile(amt, [0.5, 0.75])
+    return float(median_grant), float(p75_grant)
+
 
 class GrantNewbieUI:
     """Streamlit UI components designed for grant newcomers"""
@@ -37,19 +138,10 @@ class GrantNewbieUI:
         st.subheader("💰 Budget Reality Check")
 
         # Get actual grant amounts from data
-        median_grant = data_df["amount_usd"].median()
-        p75_grant = data_df["amount_usd"].quantile(0.75)
+        median_grant, p75_grant = _budget_stats(data_df)
 
         # Parse user's budget range
-        budget_ranges = {
-            "Under $5,000": (0, 5000),
-            "$5,000 - $25,000": (5000, 25000),
-            "$25,000 - $100,000": (25000, 100000),
-            "$100,000 - $500,000": (100000, 500000),
-            "Over $500,000": (500000, float("inf")),
-        }
-
-        user_min, user_max = budget_ranges.get(user_budget, (0, 0))
+        user_min, user_max = BUDGET_RANGES.get(user_budget, (0, 0))
 
         col1, col2 = st.columns(2)
         with col1:
@@ -83,16 +175,7 @@ def guided_project_planner():
         st.subheader("Step 2: Who benefits?")
         beneficiaries = st.multiselect(
             "Who will your project help? (Pick all that apply)",
-            [
-                "Children and youth",
-                "Seniors",
-                "Low-income families",
-                "Immigrant communities",
-                "People with disabilities",
-                "The environment",
-                "Small businesses",
-                "Other",
-            ],
+            _BENEFICIARY_OPTIONS,
         )
 
         st.subheader("Step 3: What will you actually do?")
@@ -186,22 +269,7 @@ def timeline_advisor():
 
     # Show sample calendar
     st.subheader("📆 Sample Timeline")
-    timeline_data = pd.DataFrame(
-        {
-            "Week": ["1-2", "3-4", "5-6", "7-8", "9-10", "11-12"],
-            "Focus": ["Research", "Outreach", "Writing", "Review", "Submit", "Follow up"],
-            "Activities": [
-                "Find 20 potential funders",
-                "Contact top 10 foundations",
-                "Write 3 grant proposals",
-                "Get feedback and revise",
-                "Submit applications",
-                "Follow up with funders",
-            ],
-        }
-    )
-
-    st.dataframe(timeline_data, use_container_width=True)
+    st.dataframe(_TIMELINE_DF, use_container_width=True)
 
 
 def success_stories_section():
@@ -209,22 +277,7 @@ def success_stories_section():
 
     st.header("🌟 Success Stories from People Like You")
 
-    stories = [
-        {
-            "title": "Library Gets $50K for After-School Program",
-            "person": "Sarah, Librarian",
-            "story": "I thought grants were only for big organizations. GrantScope helped me find 5 local foundations that fund education programs. I got $50,000 to create an after-school reading program!",
-            "key_to_success": "Started small - applied for $5,000 first, then used that success to get larger grants",
-        },
-        {
-            "title": "Community Garden Gets $25K Funding",
-            "person": "Mike, Volunteer Coordinator",
-            "story": "We wanted to build a community garden but had no money. The timeline advisor showed us we needed 6 months, not 2. We followed the plan and got $25,000 from 3 different funders!",
-            "key_to_success": "Applied to multiple funders with the same project - increased our odds",
-        },
-    ]
-
-    for story in stories:
+    for story in _SUCCESS_STORIES:
         with st.expander(f"📖 {story['title']}"):
             st.markdown(f"**{story['person']} says:**")
             st.write(story["story"])
@@ -237,42 +290,7 @@ def main():
     st.set_page_config(page_title="GrantScope - Newbie Edition", page_icon="🎯", layout="wide")
 
     # Custom CSS for friendly styling
-    st.markdown(
-        """
-    <style>
-    .stButton > button {
-        background-color: #4CAF50;
-        color: white;
-        font-weight: bold;
-        border-radius: 20px;
-        padding: 10px 20px;
-        border: none;
-    }
-    .stButton > button:hover {
-        background-color: #45a049;
-    }
-    .stInfo {
-        background-color: #e8f4f8;
-        border-left: 5px solid #2196F3;
-        padding: 15px;
-        border-radius: 5px;
-    }
-    .stSuccess {
-        background-color: #d4edda;
-        border-left: 5px solid #28a745;
-        padding: 15px;
-        border-radius: 5px;
-    }
-    .stWarning {
-        background-color: #fff3cd;
-        border-left: 5px solid #ffc107;
-        padding: 15px;
-        border-radius: 5px;
-    }
-    </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_CSS, unsafe_allow_html=True)
 
     st.title("🎯 GrantScope - Grant Newbie Edition")
     st.write("**Finding grants doesn't have to be confusing. Let's make it simple.**")
@@ -293,8 +311,13 @@ def main():
         # Demo with sample data
         sample_df = pd.DataFrame(
             {
-                "amount_usd": [5000, 15000, 25000, 50000, 100000, 250000] * 10,
-                "grant_geo_area_tran": ["Local", "Regional", "State"] * 20,
+                "amount_usd": np.tile(
+                    np.array([5000, 15000, 25000, 50000, 100000, 250000], dtype=np.int32), 10
+                ),
+                "grant_geo_area_tran": pd.Categorical.from_codes(
+                    np.tile(np.arange(3, dtype=np.int8), 20),
+                    categories=["Local", "Regional", "State"],
+                ),
             }
         )
         ui = GrantNewbieUI()
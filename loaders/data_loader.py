@@ -1,15 +1,51 @@
 # sourcery skip: all
+import hashlib
 import io
+import itertools
 import json
+import mmap
+import operator
 import os
-from dataclasses import asdict, dataclass, fields
+from dataclasses import dataclass, fields
 
 import numpy as np
 import pandas as pd
 import streamlit as st
 
+# Optional streaming JSON parser (picks the C yajl2 backend when installed)
+try:
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ijson = None  # type: ignore
 
-@dataclass
+# Faster C JSON parser for the non-streaming path; stdlib json when not installed
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
+
+# PyArrow backs the optional on-disk Parquet cache and the Arrow string columns
+try:
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    pq = None  # type: ignore
+
+# Bump when preprocessing output changes so stale Parquet entries are ignored
+_PREPROCESS_CACHE_VERSION = 4
+
+# Centralized config (supports package and direct execution contexts)
+try:
+    from GrantScope import config  # when executed via package context
+except Exception:
+    try:
+        import config  # fallback when executed inside GrantScope/ directly
+    except Exception:
+        config = None  # type: ignore
+
+_INVALID_FORMAT = "Invalid input format: expected a JSON object with a 'grants' array."
+
+
+@dataclass(slots=True)
 class Grant:
     funder_key: str
     funder_profile_url: str
@@ -55,45 +91,158 @@ class Grant:
 @dataclass
 class Grants:
     grants: list[Grant]
+    # Content hash of the source JSON; set when the Parquet preprocess cache is enabled
+    source_hash: str | None = None
+
+
+_GRANT_FIELDS = tuple(f.name for f in fields(Grant))
+_REQUIRED_GRANT_FIELDS = frozenset(_GRANT_FIELDS)
+# Low-cardinality fields whose values repeat across most grants; pooled on load so equal
+# values share one str object (also shrinks the pickled st.cache_data entry)
+_POOLED_GRANT_FIELDS = (
+    "funder_key",
+    "funder_name",
+    "funder_city",
+    "funder_state",
+    "funder_country",
+    "funder_type",
+    "funder_country_code",
+    "funder_gs_profile_update_level",
+    "recip_city",
+    "recip_state",
+    "recip_country",
+    "recip_country_code",
+    "recip_organization_code",
+    "recip_organization_tran",
+    "recip_gs_profile_update_level",
+    "grant_subject_code",
+    "grant_subject_tran",
+    "grant_population_code",
+    "grant_population_tran",
+    "grant_strategy_code",
+    "grant_strategy_tran",
+    "grant_transaction_code",
+    "grant_transaction_tran",
+    "grant_geo_area_code",
+    "grant_geo_area_tran",
+    "year_issued",
+    "grant_duration",
+    "last_updated",
+)
+# Slotted Grants have no __dict__; pull each row out as a tuple in field order
+_grant_row = operator.attrgetter(*_GRANT_FIELDS)
+
+
+def _iter_grant_items(fp):
+    """Yield raw grant objects from a binary JSON file object.
+
+    With ijson available the 'grants' array is stream-parsed one item at a time, so the
+    whole document is never held in memory. If streaming yields nothing (empty array or
+    unexpected shape) the file is re-read with the stdlib parser for schema validation.
+    """
+    if ijson is not None:
+        yielded = False
+        try:
+            for item in ijson.items(fp, "grants.item", use_float=True):
+                yielded = True
+                yield item
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON: {e}") from e
+        if yielded:
+            return
+        fp.seek(0)
+
+    data = _parse_json_document(fp)
+    if not isinstance(data, dict) or "grants" not in data or not isinstance(data["grants"], list):
+        st.error(_INVALID_FORMAT)
+        raise ValueError(_INVALID_FORMAT)
+    yield from data["grants"]
+
+
+def _parse_json_document(fp):
+    """Parse a whole binary JSON file object, memory-mapping real files for orjson."""
+    if orjson is None:
+        return json.load(fp)
+    try:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):
+        # In-memory uploads have no fileno; empty files cannot be mapped
+        return orjson.loads(fp.read())
+    # orjson reads the page-cached mapping directly, with no userspace copy of the file
+    with mm, memoryview(mm) as view:
+        return orjson.loads(view)
+
+
+def _content_hash(fp) -> str:
+    """Return a short blake2b digest of a binary file object and rewind it."""
+    digest = hashlib.file_digest(fp, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    fp.seek(0)
+    return digest
+
+
+def _preprocess_cache_dir() -> str | None:
+    if config is None or pq is None:
+        return None
+    try:
+        return config.get_preprocess_cache_dir()
+    except Exception:
+        return None
+
+
+def _load_grants(fp) -> Grants:
+    source_hash = _content_hash(fp) if _preprocess_cache_dir() else None
+    grants = _validate_grants(_iter_grant_items(fp))
+    grants.source_hash = source_hash
+    return grants
 
 
 @st.cache_data
 def load_data(file_path=None, uploaded_file=None):
     if uploaded_file is not None:
-        data = json.load(io.BytesIO(uploaded_file.read()))
-    elif file_path is not None:
+        if isinstance(uploaded_file, bytes | bytearray):
+            fp = io.BytesIO(uploaded_file)
+        elif hasattr(uploaded_file, "seek"):
+            # UploadedFile is already a file-like BytesIO; parse it in place
+            uploaded_file.seek(0)
+            fp = uploaded_file
+        else:
+            fp = io.BytesIO(uploaded_file.read())
+        return _load_grants(fp)
+    if file_path is not None:
         # Try provided path first; if not found, resolve relative to package root (GrantScope/)
         try:
-            with open(file_path, encoding="utf-8") as file:
-                data = json.load(file)
+            file = open(file_path, "rb")
         except FileNotFoundError:
             pkg_root = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
             alt_path = os.path.normpath(os.path.join(pkg_root, str(file_path)))
-            with open(alt_path, encoding="utf-8") as file:
-                data = json.load(file)
-    else:
-        raise ValueError("Either file_path or uploaded_file must be provided.")
+            file = open(alt_path, "rb")
+        with file:
+            return _load_grants(file)
+    raise ValueError("Either file_path or uploaded_file must be provided.")
 
-    # Basic schema validation
-    if not isinstance(data, dict) or "grants" not in data or not isinstance(data["grants"], list):
-        st.error("Invalid input format: expected a JSON object with a 'grants' array.")
-        raise ValueError("Invalid input format: expected a JSON object with a 'grants' array.")
 
-    required_fields = {f.name for f in fields(Grant)}
+def _validate_grants(items) -> Grants:
+    """Build Grant records from raw grant dicts, filling missing fields with defaults."""
     missing_counts = 0
     validated_grants = []
-    for i, grant in enumerate(data["grants"]):
+    pool: dict[str, str] = {}
+    for i, grant in enumerate(items):
         if not isinstance(grant, dict):
             error_text = f"Invalid grant at index {i}: expected an object."
             st.error(error_text)
             raise ValueError(error_text)
-        missing = required_fields - set(grant.keys())
+        # difference() probes the dict's keys directly; no per-row key set is built
+        missing = _REQUIRED_GRANT_FIELDS.difference(grant)
         if missing:
             # Count but attempt to continue by filling with defaults
             missing_counts += 1
             for key in missing:
                 # Reasonable defaults
                 grant[key] = "" if key not in ("amount_usd",) else 0
+        for key in _POOLED_GRANT_FIELDS:
+            value = grant[key]
+            if isinstance(value, str):
+                grant[key] = pool.setdefault(value, value)
         try:
             validated_grants.append(Grant(**grant))
         except TypeError as e:
@@ -108,18 +257,171 @@ def load_data(file_path=None, uploaded_file=None):
     return Grants(grants=validated_grants)
 
 
+def _clean_parts(parts: list[str]) -> list[str]:
+    cleaned = [p.strip() for p in parts if p.strip()]
+    return cleaned or ["Unknown"]
+
+
+def _split_semicolons(values: pd.Series) -> pd.Series:
+    """Split semicolon-delimited values into lists of trimmed parts (['Unknown'] if empty)."""
+    parts = values.fillna("").astype(str).str.split(";", regex=False)
+    return parts.map(_clean_parts)
+
+
+def _flatten(lists: pd.Series, lengths: np.ndarray) -> np.ndarray:
+    return np.fromiter(itertools.chain.from_iterable(lists), dtype=object, count=int(lengths.sum()))
+
+
+def _pad_pairs(codes: pd.Series, trans: pd.Series) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Align code/tran lists row by row, padding the shorter side with 'Unknown'.
+
+    Works on a flattened values + offsets layout so the pairing is pure index arithmetic.
+    Returns (pair_counts, out_codes, out_trans): the number of pairs per source row and
+    the aligned pairs laid out row after row.
+    """
+    code_lens = codes.str.len().to_numpy(dtype=np.int64)
+    tran_lens = trans.str.len().to_numpy(dtype=np.int64)
+    out_lens = np.maximum(code_lens, tran_lens)
+
+    row_ids = np.repeat(np.arange(len(out_lens)), out_lens)
+    out_starts = np.cumsum(out_lens) - out_lens
+    # Position of each output pair within its source row
+    pos = np.arange(int(out_lens.sum())) - out_starts[row_ids]
+
+    def _gather(lists: pd.Series, lens: np.ndarray) -> np.ndarray:
+        flat = _flatten(lists, lens)
+        starts = np.cumsum(lens) - lens
+        out = np.full(len(row_ids), "Unknown", dtype=object)
+        present = pos < lens[row_ids]
+        out[present] = flat[starts[row_ids[present]] + pos[present]]
+        return out
+
+    return out_lens, _gather(codes, code_lens), _gather(trans, tran_lens)
+
+
+def _explode_pairs(df: pd.DataFrame, pairs: list[tuple[str, str]]) -> pd.DataFrame:
+    """Explode several code/tran dimensions into their per-row Cartesian product at once.
+
+    Equivalent to exploding each pair in turn (first pair varies slowest), but the frame
+    is repeated a single time and each dimension is written with one gather.
+    """
+    dims = []
+    for code_col, tran_col in pairs:
+        if code_col in df.columns and tran_col in df.columns:
+            counts, codes, trans = _pad_pairs(
+                _split_semicolons(df[code_col]), _split_semicolons(df[tran_col])
+            )
+            dims.append((code_col, tran_col, counts, np.cumsum(counts) - counts, codes, trans))
+    if not dims:
+        return df
+
+    # Output rows per source row, and the stride of each dimension in the product
+    total = np.ones(len(df), dtype=np.int64)
+    for _code_col, _tran_col, counts, *_ in dims:
+        total *= counts
+    row_ids = np.repeat(np.arange(len(df)), total)
+    pos = np.arange(int(total.sum())) - (np.cumsum(total) - total)[row_ids]
+
+    out = df.iloc[row_ids].reset_index(drop=True)
+    stride = np.ones(len(df), dtype=np.int64)
+    for code_col, tran_col, counts, starts, codes, trans in reversed(dims):
+        idx = starts[row_ids] + (pos // stride[row_ids]) % counts[row_ids]
+        out[code_col] = codes[idx]
+        out[tran_col] = trans[idx]
+        stride *= counts
+    return out
+
+
+def _to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Store object (string) columns as contiguous Arrow buffers when pyarrow is available."""
+    if pq is None:
+        return df
+    # Parquet round-trips come back as python-backed "string"; normalize those too
+    string_cols = df.select_dtypes(include=["object", "string"]).columns
+    df = df.astype({col: "string[pyarrow]" for col in string_cols})
+    if pd.api.types.is_string_dtype(df.index.dtype):
+        df.index = df.index.astype("string[pyarrow]")
+    return df
+
+
+def _amount_clusters(amounts: np.ndarray, bins: list[float], names: list[str]) -> pd.Categorical:
+    """Bin amounts like pd.cut(..., include_lowest=True) via a single binary search."""
+    # Right-closed bins: a value equal to an edge belongs to the bin below it
+    codes = np.searchsorted(np.asarray(bins, dtype=np.float64), amounts, side="left") - 1
+    codes[amounts == bins[0]] = 0
+    codes[np.isnan(amounts) | (codes >= len(names))] = -1
+    return pd.Categorical.from_codes(codes, categories=names, ordered=True)
+
+
+def _cache_paths(cache_dir: str, source_hash: str) -> tuple[str, str]:
+    stem = os.path.join(cache_dir, f"{source_hash}.v{_PREPROCESS_CACHE_VERSION}")
+    return f"{stem}.exploded.parquet", f"{stem}.grouped.parquet"
+
+
+def _read_preprocess_cache(cache_dir: str, source_hash: str):
+    exploded_path, grouped_path = _cache_paths(cache_dir, source_hash)
+    if not (os.path.exists(exploded_path) and os.path.exists(grouped_path)):
+        return None
+    try:
+        return (
+            _to_arrow_strings(pd.read_parquet(exploded_path)),
+            _to_arrow_strings(pd.read_parquet(grouped_path)),
+        )
+    except Exception:
+        # Corrupt or incompatible cache entry; fall back to recomputing
+        return None
+
+
+def _write_preprocess_cache(cache_dir: str, source_hash: str, df, grouped_df) -> None:
+    exploded_path, grouped_path = _cache_paths(cache_dir, source_hash)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(exploded_path, engine="pyarrow")
+        grouped_df.to_parquet(grouped_path, engine="pyarrow")
+    except Exception:
+        # Caching is best-effort; never fail preprocessing because of it
+        for path in (exploded_path, grouped_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
 @st.cache_data
 def preprocess_data(grants):
     """Create a normalized DataFrame with exploded categorical dimensions and a grouped one-row-per-grant view.
 
+    When GS_PREPROCESS_CACHE_DIR is set (and pyarrow is installed), results are also
+    persisted as Parquet keyed by the source file's content hash, so later sessions on
+    the same file skip preprocessing entirely.
+
     Returns a tuple: (df_exploded, df_grouped_by_grant)
     """
+    cache_dir = _preprocess_cache_dir()
+    source_hash = getattr(grants, "source_hash", None)
+    if cache_dir and source_hash:
+        cached = _read_preprocess_cache(cache_dir, source_hash)
+        if cached is not None:
+            return cached
+
+    df, grouped_df = _preprocess(grants)
 
-    df = pd.DataFrame([asdict(grant) for grant in grants.grants])
+    if cache_dir and source_hash:
+        _write_preprocess_cache(cache_dir, source_hash, df, grouped_df)
+    return df, grouped_df
+
+
+def _preprocess(grants) -> tuple[pd.DataFrame, pd.DataFrame]:
+
+    df = pd.DataFrame.from_records(
+        [_grant_row(grant) for grant in grants.grants], columns=list(_GRANT_FIELDS)
+    )
 
     # Base keys and types
     df["grant_index"] = df["grant_key"]
-    df["year_issued"] = pd.to_numeric(df["year_issued"], errors="coerce").fillna(0).astype(int)
+    # Years fit int16. amount_usd stays float64: pandas/NumPy sums of float32 accumulate
+    # in float32, and dollar amounts above 2**24 would not round-trip exactly
+    df["year_issued"] = pd.to_numeric(df["year_issued"], errors="coerce").fillna(0).astype("int16")
     df["amount_usd"] = pd.to_numeric(df["amount_usd"], errors="coerce")
     df = df.dropna(subset=["amount_usd"])
 
@@ -134,23 +436,6 @@ def preprocess_data(grants):
     # Ensure description is string-like; coerce non-strings
     df["grant_description"] = df["grant_description"].astype(str).fillna("")
 
-    # Helper to split a semicolon string into list (or ['Unknown'] if empty)
-    def split_semicolons(val: str) -> list[str]:
-        if val is None or (isinstance(val, float) and pd.isna(val)):
-            return ["Unknown"]
-        s = str(val).strip()
-        if not s:
-            return ["Unknown"]
-        parts = [p.strip() for p in s.split(";") if p.strip()]
-        return parts or ["Unknown"]
-
-    # Helper to align two lists to the same length and zip as pairs
-    def align_zip(a: list[str], b: list[str]) -> list[tuple[str, str]]:
-        m = max(len(a), len(b))
-        a += ["Unknown"] * (m - len(a))
-        b += ["Unknown"] * (m - len(b))
-        return list(zip(a, b, strict=False))
-
     # Explode paired code/tran dimensions while preserving alignment
     pairs = [
         ("grant_subject_code", "grant_subject_tran"),
@@ -160,25 +445,18 @@ def preprocess_data(grants):
         ("grant_geo_area_code", "grant_geo_area_tran"),
     ]
 
-    for code_col, tran_col in pairs:
-        if code_col in df.columns and tran_col in df.columns:
-            pair_col = f"__{code_col}_pair"
-            codes = df[code_col].apply(split_semicolons)
-            trans = df[tran_col].apply(split_semicolons)
-            df[pair_col] = [align_zip(c, t) for c, t in zip(codes, trans, strict=False)]
-            df = df.explode(pair_col, ignore_index=True)
-            # Expand back into the two columns
-            expanded = pd.DataFrame(
-                df[pair_col].tolist(), columns=[code_col, tran_col], index=df.index
-            )
-            df[code_col] = expanded[code_col]
-            df[tran_col] = expanded[tran_col]
-            df.drop(columns=[pair_col], inplace=True)
+    # Source duplicates of a grant carry identical code/tran strings and would explode
+    # into combos the post-explode de-dup drops anyway; drop them while rows are cheap
+    df = df.drop_duplicates(
+        subset=["year_issued", "grant_key", *(col for pair in pairs for col in pair)]
+    )
+
+    df = _explode_pairs(df, pairs)
 
     # Amount clusters
     bins = [0, 50_000, 100_000, 500_000, 1_000_000, np.inf]
     names = ["0-50k", "50k-100k", "100k-500k", "500k-1M", "1M+"]
-    df["amount_usd_cluster"] = pd.cut(df["amount_usd"], bins, labels=names, include_lowest=True)
+    df["amount_usd_cluster"] = _amount_clusters(df["amount_usd"].to_numpy(), bins, names)
 
     # De-duplicate on (year, grant_key) to reduce exact duplicates from source
     df = df.drop_duplicates(
@@ -193,8 +471,14 @@ def preprocess_data(grants):
         ]
     )
 
+    # Convert after the explode: splitting and gathering work on Python strings, and the
+    # long per-grant text would otherwise be copied byte-for-byte into every repeated row
+    df = _to_arrow_strings(df)
+
     # Group to one row per grant (best-effort first occurrence per exploded combos)
-    grouped_df = df.groupby("grant_index", as_index=False).first().set_index("grant_index")
+    # After the fills above a grant's rows share every non-exploded value, so keeping the
+    # first row per key matches groupby().first() without building and sorting groups
+    grouped_df = df.drop_duplicates("grant_index").set_index("grant_index")
 
     # Add aggregated data summaries for rich context
     df = _add_aggregated_summaries(df)
@@ -202,111 +486,86 @@ def preprocess_data(grants):
     return df, grouped_df
 
 
-def _add_aggregated_summaries(df: pd.DataFrame) -> pd.DataFrame:
-    """Add aggregated data summaries for rich context."""
-    # Add summary statistics columns
-    df["_total_amount"] = df["amount_usd"].sum()
-    df["_grant_count"] = len(df)
-    df["_avg_amount"] = df["amount_usd"].mean()
-    df["_median_amount"] = df["amount_usd"].median()
-
-    # Add funder-level aggregations
-    funder_stats = (
-        df.groupby("funder_name")["amount_usd"].agg(["sum", "count", "mean"]).reset_index()
-    )
-    funder_stats.columns = [
-        "funder_name",
-        "_funder_total_amount",
-        "_funder_grant_count",
-        "_funder_avg_amount",
-    ]
-    funder_stats["_funder_rank_by_amount"] = funder_stats["_funder_total_amount"].rank(
-        method="dense", ascending=False
-    )
-    funder_stats["_funder_rank_by_count"] = funder_stats["_funder_grant_count"].rank(
-        method="dense", ascending=False
-    )
-
-    # Merge back to main dataframe
-    df = df.merge(funder_stats, on="funder_name", how="left")
-
-    # Add subject-level aggregations
-    if "grant_subject_tran" in df.columns:
-        subject_stats = (
-            df.groupby("grant_subject_tran")["amount_usd"].agg(["sum", "count"]).reset_index()
-        )
-        subject_stats.columns = [
-            "grant_subject_tran",
-            "_subject_total_amount",
-            "_subject_grant_count",
-        ]
-        subject_stats["_subject_rank_by_amount"] = subject_stats["_subject_total_amount"].rank(
-            method="dense", ascending=False
-        )
-        subject_stats["_subject_rank_by_count"] = subject_stats["_subject_grant_count"].rank(
-            method="dense", ascending=False
-        )
-        subject_stats["_subject_percentage_of_total"] = (
-            subject_stats["_subject_total_amount"] / df["amount_usd"].sum()
-        ) * 100
+def _gather_group_stats(key: pd.Series, stats: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Expand per-group stat columns to one value per row, aligned by categorical key codes.
 
-        # Merge back to main dataframe
-        df = df.merge(subject_stats, on="grant_subject_tran", how="left")
+    stats is indexed by group key with one stat per column. Rows whose key is missing
+    get NaN, matching a left merge.
+    """
+    aligned = stats.reindex(key.cat.categories)
+    codes = key.cat.codes.to_numpy()
+    missing = codes < 0
+    gathered = {}
+    for col in aligned.columns:
+        values = aligned[col].to_numpy()[codes]
+        if missing.any():
+            values = values.astype("float64")
+            values[missing] = np.nan
+        gathered[col] = values
+    return gathered
+
+
+# (column, stat prefix, add mean, add share of overall total) per summary dimension
+_SUMMARY_DIMENSIONS = (
+    ("funder_name", "_funder", True, False),
+    ("grant_subject_tran", "_subject", False, True),
+    ("grant_population_tran", "_population", False, True),
+    ("grant_geo_area_tran", "_geo", False, True),
+    ("year_issued", "_year", False, False),
+)
+
+
+def _dimension_stats(
+    df: pd.DataFrame,
+    key: pd.Series,
+    prefix: str,
+    total_amt: float,
+    with_mean: bool,
+    with_pct: bool,
+) -> pd.DataFrame:
+    """Per-group totals, counts and dense ranks for one dimension (one grouped pass)."""
+    total_col, count_col = f"{prefix}_total_amount", f"{prefix}_grant_count"
+    stats = df.groupby(key, observed=True)["amount_usd"].agg(
+        **{total_col: "sum", count_col: "count"}
+    )
+    if with_mean:
+        # Derived from sum/count rather than running a third groupby reduction
+        stats[f"{prefix}_avg_amount"] = stats[total_col] / stats[count_col]
+    stats[f"{prefix}_rank_by_amount"] = stats[total_col].rank(method="dense", ascending=False)
+    stats[f"{prefix}_rank_by_count"] = stats[count_col].rank(method="dense", ascending=False)
+    if with_pct:
+        stats[f"{prefix}_percentage_of_total"] = (stats[total_col] / total_amt) * 100
+    return stats
 
-    # Add population-level aggregations
-    if "grant_population_tran" in df.columns:
-        population_stats = (
-            df.groupby("grant_population_tran")["amount_usd"].agg(["sum", "count"]).reset_index()
-        )
-        population_stats.columns = [
-            "grant_population_tran",
-            "_population_total_amount",
-            "_population_grant_count",
-        ]
-        population_stats["_population_rank_by_amount"] = population_stats[
-            "_population_total_amount"
-        ].rank(method="dense", ascending=False)
-        population_stats["_population_rank_by_count"] = population_stats[
-            "_population_grant_count"
-        ].rank(method="dense", ascending=False)
-        population_stats["_population_percentage_of_total"] = (
-            population_stats["_population_total_amount"] / df["amount_usd"].sum()
-        ) * 100
-
-        # Merge back to main dataframe
-        df = df.merge(population_stats, on="grant_population_tran", how="left")
-
-    # Add geography-level aggregations
-    if "grant_geo_area_tran" in df.columns:
-        geo_stats = (
-            df.groupby("grant_geo_area_tran")["amount_usd"].agg(["sum", "count"]).reset_index()
-        )
-        geo_stats.columns = ["grant_geo_area_tran", "_geo_total_amount", "_geo_grant_count"]
-        geo_stats["_geo_rank_by_amount"] = geo_stats["_geo_total_amount"].rank(
-            method="dense", ascending=False
-        )
-        geo_stats["_geo_rank_by_count"] = geo_stats["_geo_grant_count"].rank(
-            method="dense", ascending=False
-        )
-        geo_stats["_geo_percentage_of_total"] = (
-            geo_stats["_geo_total_amount"] / df["amount_usd"].sum()
-        ) * 100
-
-        # Merge back to main dataframe
-        df = df.merge(geo_stats, on="grant_geo_area_tran", how="left")
-
-    # Add time trend aggregations
-    if "year_issued" in df.columns:
-        year_stats = df.groupby("year_issued")["amount_usd"].agg(["sum", "count"]).reset_index()
-        year_stats.columns = ["year_issued", "_year_total_amount", "_year_grant_count"]
-        year_stats["_year_rank_by_amount"] = year_stats["_year_total_amount"].rank(
-            method="dense", ascending=False
-        )
-        year_stats["_year_rank_by_count"] = year_stats["_year_grant_count"].rank(
-            method="dense", ascending=False
-        )
 
-        # Merge back to main dataframe
-        df = df.merge(year_stats, on="year_issued", how="left")
+def _add_aggregated_summaries(df: pd.DataFrame) -> pd.DataFrame:
+    """Add aggregated data summaries for rich context."""
+    df = df.reset_index(drop=True)
+    # Only new columns are added below, so the overall total is reduced once and reused
+    total_amt = df["amount_usd"].sum()
+
+    summary_cols: dict[str, np.ndarray] = {}
+    for col, prefix, with_mean, with_pct in _SUMMARY_DIMENSIONS:
+        if col not in df.columns:
+            continue
+        # Group on categorical codes instead of re-hashing the string keys in every groupby;
+        # the frame's own columns keep their dtype
+        key = df[col].astype("category")
+        stats = _dimension_stats(df, key, prefix, total_amt, with_mean, with_pct)
+        # Expand back onto rows by category code (no hash join)
+        summary_cols.update(_gather_group_stats(key, stats))
+
+    # Attach every stat column in one concat rather than ~20 single-column inserts
+    df = pd.concat([df, pd.DataFrame(summary_cols, index=df.index)], axis=1)
+
+    # Dataset-wide scalars live in attrs rather than as constant full-length columns
+    df.attrs.update(
+        {
+            "total_amount": float(total_amt),
+            "grant_count": int(len(df)),
+            "avg_amount": float(df["amount_usd"].mean()),
+            "median_amount": float(df["amount_usd"].median()),
+        }
+    )
 
     return df
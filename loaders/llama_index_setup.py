@@ -1,36 +1,48 @@
+import hashlib
 import importlib
+import json
 import os
-from collections.abc import Iterable
-from typing import Any, cast
-
+import re
+import sys
+import threading
+import weakref
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING, Any, cast
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-from llama_index.core import Settings
 
+# The OpenAI SDK and llama_index are imported on first LLM use, not at module import:
+# together they add seconds to cold starts of pages and tests that never call the model.
 # from llama_index.experimental.query_engine import PandasQueryEngine  # disabled: avoids safe_eval-based code execution
-from llama_index.llms.openai import OpenAI as LI_OpenAI
-from openai import OpenAI as OpenAIClient
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from collections.abc import Iterable
 
+    from openai import OpenAI as OpenAIClient
+    from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
 
-def _disable_pandas_query_engine() -> None:
-    """Disable LlamaIndex PandasQueryEngine by stubbing it with a clear error."""
-    try:
-        exp_mod = importlib.import_module("llama_index.experimental.query_engine")
 
-        class _DisabledPandasQueryEngine:  # pragma: no cover - defensive stub
-            def __init__(self, *args, **kwargs):
-                raise RuntimeError(
-                    "PandasQueryEngine is disabled for safety in this build. "
-                    "Use the tool_query() pipeline (function-calling tools) instead."
-                )
+class _DisabledPandasQueryEngine:  # pragma: no cover - defensive stub
+    def __init__(self, *args, **kwargs):
+        raise RuntimeError(
+            "PandasQueryEngine is disabled for safety in this build. "
+            "Use the tool_query() pipeline (function-calling tools) instead."
+        )
 
-        exp_mod.PandasQueryEngine = _DisabledPandasQueryEngine
-    except Exception:
-        # If experimental package not present or structure changes, ignore silently
-        pass
 
+def _disable_pandas_query_engine() -> None:
+    """Disable LlamaIndex PandasQueryEngine by stubbing it with a clear error.
+
+    Only patches the experimental package if something already imported it; the app never does,
+    so importing it here just to stub it out would cost seconds for nothing.
+    """
+    exp_mod = sys.modules.get("llama_index.experimental.query_engine")
+    if exp_mod is not None:
+        exp_mod.PandasQueryEngine = _DisabledPandasQueryEngine
 
-_disable_pandas_query_engine()
 
 # Centralized config for secrets/flags (supports package and direct execution contexts)
 try:
@@ -52,18 +64,32 @@ if config is not None:
         pass
 
 
-# Setup LlamaIndex with specific model and settings
-@st.cache_resource(show_spinner=False)
-def setup_llama_index():
-    """Initialize and cache the LLM settings for LlamaIndex."""
-    model_name = "gpt-5-mini"
+@cache
+def _resolved_model_name() -> str:
+    """Resolve the model name once from central config (env/secrets), default gpt-5-mini.
+
+    Like the LLM wired by setup_llama_index, a changed OPENAI_MODEL takes effect on restart.
+    """
     if config is not None:
         try:
-            model_name = config.get_model_name()
+            return config.get_model_name()
         except Exception:
             # Fall back to default if config lookup fails
-            model_name = "gpt-5-mini"
+            pass
+    return "gpt-5-mini"
+
+
+# Setup LlamaIndex with specific model and settings. Every query path calls this, so it is
+# memoized with functools.cache (a plain dict hit) rather than st.cache_resource's hashed lookup.
+@cache
+def setup_llama_index():
+    """Initialize and cache the LLM settings for LlamaIndex."""
+    _disable_pandas_query_engine()
+    model_name = _resolved_model_name()
     try:
+        from llama_index.core import Settings
+        from llama_index.llms.openai import OpenAI as LI_OpenAI
+
         Settings.llm = LI_OpenAI(model=model_name)
         return Settings.llm
     except Exception:
@@ -71,8 +97,53 @@ def setup_llama_index():
         return None
 
 
+# Minimal, dependency-free stand-in for the OpenAI client, used when no API key is set or
+# the SDK cannot initialize. Stateless, so one shared instance serves every caller.
+class _DummyMsg:
+    tool_calls = None  # like the SDK's message model, always defined
+
+    def __init__(self, content: str = "OK"):
+        self.content = content
+
+
+class _DummyChoice:
+    def __init__(self, message):
+        self.message = message
+
+
+class _DummyResp:
+    def __init__(self, content: str = "OK"):
+        self.choices = [_DummyChoice(_DummyMsg(content))]
+
+
+class _DummyStream(list):
+    # Behaves like an empty iterable for streaming paths
+    pass
+
+
+class _DummyCompletions:
+    def create(self, **kwargs):
+        # Support both streaming and non-streaming paths
+        if kwargs.get("stream"):
+            return _DummyStream()
+        return _DummyResp("OK")
+
+
+class _DummyChat:
+    def __init__(self):
+        self.completions = _DummyCompletions()
+
+
+class _DummyClient:
+    def __init__(self):
+        self.chat = _DummyChat()
+
+
+_DUMMY_CLIENT = _DummyClient()
+
+
 @st.cache_resource(show_spinner=False)
-def get_openai_client() -> OpenAIClient:
+def get_openai_client() -> "OpenAIClient":
     """Create and cache an OpenAI client (SDK v1.x reads OPENAI_API_KEY from env).
 
     In test/CI environments where OPENAI_API_KEY is not set, return a lightweight
@@ -85,168 +156,157 @@ def get_openai_client() -> OpenAIClient:
         key = None
 
     if not key:
-        # Minimal, dependency-free dummy client
-        class _DummyMsg:
-            def __init__(self, content: str = "OK"):
-                self.content = content
-
-        class _DummyChoice:
-            def __init__(self, message):
-                self.message = message
-
-        class _DummyResp:
-            def __init__(self, content: str = "OK"):
-                self.choices = [_DummyChoice(_DummyMsg(content))]
-
-        class _DummyCompletions:
-            def create(self, **kwargs):
-                # Support both streaming and non-streaming paths
-                if kwargs.get("stream"):
-                    # Return an empty iterable; consumers handle empty streams defensively
-                    return []
-                return _DummyResp("OK")
-
-        class _DummyChat:
-            def __init__(self):
-                self.completions = _DummyCompletions()
-
-        class _DummyClient:
-            def __init__(self):
-                self.chat = _DummyChat()
-
-        return _DummyClient()  # type: ignore[return-value]
+        return _DUMMY_CLIENT  # type: ignore[return-value]
 
     # The OpenAI Python SDK v1+ uses environment variable OPENAI_API_KEY automatically.
-    # We still import the class at module import time (see top) to avoid runtime import costs.
+    # Imported here (once per cached client) so module import stays cheap.
     try:
+        from openai import OpenAI as OpenAIClient
+
         return OpenAIClient()
     except Exception:
-        # Fallback to a minimal dummy client when OpenAI SDK cannot initialize (e.g., missing API key)
-        class _DummyMsg:
-            def __init__(self, content: str = "OK"):
-                self.content = content
-
-        class _DummyChoice:
-            def __init__(self, message):
-                self.message = message
-
-        class _DummyResp:
-            def __init__(self, content: str = "OK"):
-                self.choices = [_DummyChoice(_DummyMsg(content))]
+        # Fallback to the dummy client when OpenAI SDK cannot initialize (e.g., missing API key)
+        return _DUMMY_CLIENT  # type: ignore[return-value]
+
+
+# Chart-specific prompt context keyed by stable chart id (built once at import)
+_CHART_CONTEXT_MAP: dict[str, str] = {
+    # Data Summary
+    "data_summary.top_funders": (
+        "Chart Focus: Top Funders by total grant amount. Use the displayed aggregate table "
+        "to reason about which funders contribute the most overall."
+    ),
+    "data_summary.general": (
+        "Chart Focus: General dataset overview. Consider overall distributions, common fields, "
+        "and high-level trends without focusing on a specific visualization."
+    ),
+    "data_summary.funder_type": (
+        "Chart Focus: Distribution of total grant amount by funder type. Smaller categories may be "
+        "aggregated into 'Other' on pages with many funder types."
+    ),
+    "data_summary.subject_area": (
+        "Chart Focus: Top grant subject areas by total amount. Use bar lengths to compare emphasis "
+        "across subjects."
+    ),
+    "data_summary.population": (
+        "Chart Focus: Top populations served by total amount. Compare which populations receive "
+        "more funding."
+    ),
+    # Distribution
+    "distribution.main": (
+        "Chart Focus: Distribution of grant amounts across USD clusters. Reference the selected "
+        "clusters and sorting to keep the answer grounded."
+    ),
+    # Scatter
+    "scatter.main": (
+        "Chart Focus: Scatter of grant amounts across years, colored by USD cluster. Consider the "
+        "selected year range and clusters."
+    ),
+    # Heatmap
+    "heatmap.main": (
+        "Chart Focus: Heatmap of total grant amount across two categorical dimensions. Use rows/columns "
+        "to reason about intersections."
+    ),
+    # Treemaps
+    "treemaps.main": (
+        "Chart Focus: Treemap of total grant amounts grouped by a selected categorical dimension "
+        "(one of grant_strategy_tran, grant_subject_tran, grant_population_tran) and filtered by a "
+        "selected USD range label. Use the hierarchical boxes to describe relative contributions and "
+        "highlight top segments. Consider the current analyze_column and selected_label."
+    ),
+    # Word Clouds
+    "wordclouds.main": (
+        "Chart Focus: Word clouds generated from grant descriptions. Treat these as qualitative signals "
+        "of frequent terms; do not fabricate data outside the provided descriptions."
+    ),
+    # Relationships
+    "relationships.description_vs_amount": (
+        "Chart Focus: Scatter of grant description word count vs award amount. Discuss correlation "
+        "patterns and outliers; do not assume causation."
+    ),
+    "relationships.avg_by_factor": (
+        "Chart Focus: Average award amount by a selected categorical factor (bar or box plot). "
+        "Reference the selected factor and summarize differences."
+    ),
+    "relationships.funder_affinity": (
+        "Chart Focus: Funder affinity across a chosen categorical dimension, summing total amounts "
+        "for the selected funder. Highlight top categories."
+    ),
+    # Top Categories
+    "top_categories.main": (
+        "Chart Focus: Unique grant counts across the selected categorical variable (bar/pie/treemap). "
+        "Discuss which categories account for most unique grants."
+    ),
+}
 
-        class _DummyStream(list):
-            # Behaves like an empty iterable for streaming paths
-            pass
 
-        class _DummyCompletions:
-            def create(self, **kwargs):
-                if kwargs.get("stream"):
-                    return _DummyStream()
-                return _DummyResp("OK")
+def resolve_chart_context(chart_id: str) -> str | None:
+    """Return additional chart-specific context text based on a stable chart identifier.
 
-        class _DummyChat:
-            def __init__(self):
-                self.completions = _DummyCompletions()
+    This is a lightweight resolver intended to enrich prompts with chart-specific
+    hints/metadata. It can be extended to return LlamaIndex nodes/documents later.
+    """
+    # Chart ids are normally clean strings: try them as-is before str()/strip() copies
+    hit = _CHART_CONTEXT_MAP.get(chart_id) if isinstance(chart_id, str) else None
+    return hit if hit is not None else _CHART_CONTEXT_MAP.get(str(chart_id).strip())
 
-        class _DummyClient:
-            def __init__(self):
-                self.chat = _DummyChat()
 
-        return _DummyClient()
+_APP_STATE_MODULES = ("utils.app_state", "GrantScope.utils.app_state")
 
 
-def resolve_chart_context(chart_id: str) -> str | None:
-    """Return additional chart-specific context text based on a stable chart identifier.
+def _app_state_getter(name: str):
+    """Return the named utils.app_state function, or None when app state is unavailable.
 
-    This is a lightweight resolver intended to enrich prompts with chart-specific
-    hints/metadata. It can be extended to return LlamaIndex nodes/documents later.
+    Looks in sys.modules first so steady-state turns skip the import machinery; resolving per
+    call (rather than binding at import) still honours a module swapped in by tests.
     """
-    context_map = {
-        # Data Summary
-        "data_summary.top_funders": (
-            "Chart Focus: Top Funders by total grant amount. Use the displayed aggregate table "
-            "to reason about which funders contribute the most overall."
-        ),
-        "data_summary.general": (
-            "Chart Focus: General dataset overview. Consider overall distributions, common fields, "
-            "and high-level trends without focusing on a specific visualization."
-        ),
-        "data_summary.funder_type": (
-            "Chart Focus: Distribution of total grant amount by funder type. Smaller categories may be "
-            "aggregated into 'Other' on pages with many funder types."
-        ),
-        "data_summary.subject_area": (
-            "Chart Focus: Top grant subject areas by total amount. Use bar lengths to compare emphasis "
-            "across subjects."
-        ),
-        "data_summary.population": (
-            "Chart Focus: Top populations served by total amount. Compare which populations receive "
-            "more funding."
-        ),
-        # Distribution
-        "distribution.main": (
-            "Chart Focus: Distribution of grant amounts across USD clusters. Reference the selected "
-            "clusters and sorting to keep the answer grounded."
-        ),
-        # Scatter
-        "scatter.main": (
-            "Chart Focus: Scatter of grant amounts across years, colored by USD cluster. Consider the "
-            "selected year range and clusters."
-        ),
-        # Heatmap
-        "heatmap.main": (
-            "Chart Focus: Heatmap of total grant amount across two categorical dimensions. Use rows/columns "
-            "to reason about intersections."
-        ),
-        # Treemaps
-        "treemaps.main": (
-            "Chart Focus: Treemap of total grant amounts grouped by a selected categorical dimension "
-            "(one of grant_strategy_tran, grant_subject_tran, grant_population_tran) and filtered by a "
-            "selected USD range label. Use the hierarchical boxes to describe relative contributions and "
-            "highlight top segments. Consider the current analyze_column and selected_label."
-        ),
-        # Word Clouds
-        "wordclouds.main": (
-            "Chart Focus: Word clouds generated from grant descriptions. Treat these as qualitative signals "
-            "of frequent terms; do not fabricate data outside the provided descriptions."
-        ),
-        # Relationships
-        "relationships.description_vs_amount": (
-            "Chart Focus: Scatter of grant description word count vs award amount. Discuss correlation "
-            "patterns and outliers; do not assume causation."
-        ),
-        "relationships.avg_by_factor": (
-            "Chart Focus: Average award amount by a selected categorical factor (bar or box plot). "
-            "Reference the selected factor and summarize differences."
-        ),
-        "relationships.funder_affinity": (
-            "Chart Focus: Funder affinity across a chosen categorical dimension, summing total amounts "
-            "for the selected funder. Highlight top categories."
-        ),
-        # Top Categories
-        "top_categories.main": (
-            "Chart Focus: Unique grant counts across the selected categorical variable (bar/pie/treemap). "
-            "Discuss which categories account for most unique grants."
-        ),
-    }
-    return context_map.get(str(chart_id).strip() or "", None)
+    for mod_name in _APP_STATE_MODULES:
+        mod = sys.modules.get(mod_name)
+        if mod is None:
+            try:
+                mod = importlib.import_module(mod_name)
+            except Exception:
+                continue
+        fn = getattr(mod, name, None)
+        if fn is not None:
+            return fn
+    return None
 
 
 # Compact "User Context" wedge builder (centralized helper)
+# Session-state slot holding ((profile_version, max_len), wedge) for the user context wedge
+_USER_WEDGE_STATE_KEY = "_user_ctx_wedge_cache"
+
+
 def _build_user_context_wedge(max_len: int = 160) -> str | None:
     """Construct a compact 'User Context:' wedge using org_type, region, and a short goal.
     Returns None when the profile is absent or fields are empty. The result is capped to max_len.
     """
     try:
-        # Defer import to avoid hard dependency during non-UI tests
-        try:
-            from utils.app_state import get_session_profile  # type: ignore
-        except Exception:
-            try:
-                from GrantScope.utils.app_state import get_session_profile  # type: ignore
-            except Exception:
-                return None
+        get_session_profile = _app_state_getter("get_session_profile")
+        if get_session_profile is None:
+            return None
 
+        # Profiles rarely change between turns: reuse the last wedge until app_state reports a
+        # profile change (modules without the version getter always recompute)
+        get_version = _app_state_getter("get_session_profile_version")
+        if get_version is None:
+            return _compute_user_context_wedge(get_session_profile, max_len)
+        key = (get_version(), max_len)
+        cached = st.session_state.get(_USER_WEDGE_STATE_KEY)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        wedge = _compute_user_context_wedge(get_session_profile, max_len)
+        st.session_state[_USER_WEDGE_STATE_KEY] = (key, wedge)
+        return wedge
+    except Exception:
+        # Fail closed; context injection is optional
+        return None
+
+
+def _compute_user_context_wedge(get_session_profile, max_len: int) -> str | None:
+    """Build the 'User Context:' wedge from the current session profile."""
+    try:
         prof = get_session_profile()
         if not prof:
             return None
@@ -254,34 +314,38 @@ def _build_user_context_wedge(max_len: int = 160) -> str | None:
         org = getattr(prof, "org_type", "") or ""
         region = getattr(prof, "region", "") or ""
         goal = getattr(prof, "primary_goal", "") or ""
-
-        bits: list[str] = []
-        if org:
-            bits.append(f"org_type={org}")
-        if region:
-            bits.append(f"region={region}")
-        if goal:
-            # Deterministic short summary: collapse whitespace and take the first N tokens
-            goal_clean = " ".join(str(goal).split())
-            goal_short = " ".join(goal_clean.split()[:10])
-            if goal_short:
-                bits.append(f"goal={goal_short}")
-
-        if not bits:
-            return None
-
-        wedge = f"User Context: {', '.join(bits)}."
-        if len(wedge) > max_len:
-            # Hard cap to max_len without leaking extra text; trim trailing separators
-            wedge = wedge[:max_len].rstrip()
-            wedge = wedge.rstrip(",; ")
-
-        return wedge
+        return _format_user_context_wedge(str(org), str(region), str(goal), max_len)
     except Exception:
         # Fail closed; context injection is optional
         return None
 
 
+@lru_cache(maxsize=16)
+def _format_user_context_wedge(org: str, region: str, goal: str, max_len: int) -> str | None:
+    """Format (and memoize) the wedge text for one profile's org_type/region/goal."""
+    bits: list[str] = []
+    if org:
+        bits.append(f"org_type={org}")
+    if region:
+        bits.append(f"region={region}")
+    if goal:
+        # Deterministic short summary: collapse whitespace and take the first N tokens
+        goal_short = " ".join(goal.split()[:10])
+        if goal_short:
+            bits.append(f"goal={goal_short}")
+
+    if not bits:
+        return None
+
+    wedge = f"User Context: {', '.join(bits)}."
+    if len(wedge) > max_len:
+        # Hard cap to max_len without leaking extra text; trim trailing separators
+        wedge = wedge[:max_len].rstrip()
+        wedge = wedge.rstrip(",; ")
+
+    return wedge
+
+
 def _build_planner_budget_wedge(max_len: int = 240) -> str | None:
     """Construct a compact wedge summarizing planner and budget when present.
 
@@ -289,16 +353,10 @@ def _build_planner_budget_wedge(max_len: int = 240) -> str | None:
     Returns None when neither summary exists. Caps the total length to max_len.
     """
     try:
-        try:
-            from utils.app_state import get_budget_summary, get_planner_summary  # type: ignore
-        except Exception:
-            try:
-                from GrantScope.utils.app_state import (  # type: ignore
-                    get_budget_summary,
-                    get_planner_summary,
-                )
-            except Exception:
-                return None
+        get_planner_summary = _app_state_getter("get_planner_summary")
+        get_budget_summary = _app_state_getter("get_budget_summary")
+        if get_planner_summary is None or get_budget_summary is None:
+            return None
 
         pb: list[str] = []
         try:
@@ -325,43 +383,52 @@ def _build_planner_budget_wedge(max_len: int = 240) -> str | None:
         return None
 
 
+# System prompts are static; the message dicts are built once and shared (never mutated).
+# query_data and stream_query share one prompt to keep their behavior consistent.
+_SYSTEM_PROMPT_DATA_ANALYST = (
+    "You are a helpful data analyst. Only answer using information grounded in the provided "
+    "Known Columns and any Sample Context included in the prompt. If the user asks about a "
+    "column or field that is not listed under Known Columns, you MUST clearly state that the "
+    "information is not available in the dataset. Respond in concise Markdown."
+)
+_SYSTEM_MESSAGE_DATA_ANALYST = {"role": "system", "content": _SYSTEM_PROMPT_DATA_ANALYST}
+
+_SYSTEM_PROMPT_TOOL_ANALYST = (
+    "You are a helpful data analyst. Use the provided tools to inspect the dataframe "
+    "when you need specific numbers or slices. Only answer using information grounded "
+    "in the Known Columns, the tool outputs, and any Additional Chart Context. If the "
+    "user asks about a column not listed, clearly state that it is not available. "
+    "Respond in concise Markdown."
+)
+_SYSTEM_MESSAGE_TOOL_ANALYST = {"role": "system", "content": _SYSTEM_PROMPT_TOOL_ANALYST}
+
+
+# Markdown escaping for model output ($ would otherwise start LaTeX math in st.markdown)
+_ESCAPE_TBL = str.maketrans({"$": "\\$"})
+
+
 # Function to query data (non-streaming) without executing generated Pandas code
 def query_data(df, query_text, pre_prompt):
     """Return a full, non-streamed answer using direct OpenAI chat completion (no Pandas code execution).
 
-    Adds a compact 'User Context:' wedge (<=160 chars) when a session profile exists, and includes
-    Known Columns and any chart-specific context if available.
+    Includes Known Columns and any chart-specific context, plus a compact 'User Context:' wedge
+    (<=160 chars) when a session profile exists. The user message runs from most to least stable
+    content so repeated turns share a long prompt prefix (OpenAI caches prefixes automatically).
     """
     # Ensure LLM (Settings.llm) is initialized for consistency
     setup_llama_index()
 
-    # System prompt aligned with stream_query to keep behavior consistent
-    system_prompt = (
-        "You are a helpful data analyst. Only answer using information grounded in the provided "
-        "Known Columns and any Sample Context included in the prompt. If the user asks about a "
-        "column or field that is not listed under Known Columns, you MUST clearly state that the "
-        "information is not available in the dataset. Respond in concise Markdown."
-    )
-
-    # Optionally enrich pre_prompt with known columns for grounding
+    # Known columns for grounding
     try:
-        known_cols = ", ".join(map(str, getattr(df, "columns", [])))
-        pre_prompt_eff = f"{pre_prompt} Known Columns: {known_cols}".strip()
+        known_cols = _known_columns_text(df)
+        known_cols_part = f"Known Columns: {known_cols}"
     except Exception:
-        pre_prompt_eff = pre_prompt
+        known_cols_part = ""
 
     # Resolve chart context if available (best-effort)
     extra_ctx = None
     try:
-        try:
-            from utils.app_state import get_selected_chart as _get_sel  # type: ignore
-        except Exception:
-            try:
-                from GrantScope.utils.app_state import (
-                    get_selected_chart as _get_sel,  # type: ignore
-                )
-            except Exception:
-                _get_sel = None  # type: ignore
+        _get_sel = _app_state_getter("get_selected_chart")
         if _get_sel is not None:
             try:
                 cid = _get_sel(None)
@@ -372,8 +439,11 @@ def query_data(df, query_text, pre_prompt):
     except Exception:
         extra_ctx = None
 
-    # Build user message content with compact user context wedge first
-    ctx_parts: list[str] = []
+    # Build user message content from most to least stable: dataset columns, page prompt and
+    # chart context, then per-user wedges, with the query last (keeps the cacheable prefix long)
+    ctx_parts: list[str] = [known_cols_part, pre_prompt]
+    if extra_ctx:
+        ctx_parts.append(f"Additional Chart Context: {extra_ctx}")
     wedge = _build_user_context_wedge()
     if wedge:
         try:
@@ -388,27 +458,18 @@ def query_data(df, query_text, pre_prompt):
         pb_wedge = None
     if pb_wedge:
         ctx_parts.append(pb_wedge)
-    if extra_ctx:
-        ctx_parts.append(f"Additional Chart Context: {extra_ctx}")
-    ctx_parts.append(pre_prompt_eff)
     user_content = " ".join(p for p in ctx_parts if p).strip()
     if query_text:
         user_content = f"{user_content} {query_text}".strip()
 
-    # Resolve model name from central config (env/secrets override supported), default gpt-5-mini
-    model_name = "gpt-5-mini"
-    if config is not None:
-        try:
-            model_name = config.get_model_name()
-        except Exception:
-            model_name = "gpt-5-mini"
+    model_name = _resolved_model_name()
 
     client = get_openai_client()
     try:
         resp = client.chat.completions.create(
             model=model_name,
             messages=[
-                {"role": "system", "content": system_prompt},
+                _SYSTEM_MESSAGE_DATA_ANALYST,
                 {"role": "user", "content": user_content},
             ],
         )
@@ -416,11 +477,14 @@ def query_data(df, query_text, pre_prompt):
             content = resp.choices[0].message.content or ""
         except Exception:
             content = str(resp)
-        return (content or "").replace("$", "\\$")
+        return (content or "").translate(_ESCAPE_TBL)
     except Exception as e:
         return f"Query error (non-streaming): {e}"
 
 
+_STREAM_FLUSH_CHARS = 32
+
+
 def stream_query(df, query_text, pre_prompt):
     """Yield assistant tokens using OpenAI streaming. Cancelling is handled by the consumer."""
     # Ensure LLM is initialized (cached) for consistent model/temperature settings (best-effort)
@@ -429,28 +493,18 @@ def stream_query(df, query_text, pre_prompt):
     except Exception:
         pass
 
-    system_prompt = (
-        "You are a helpful data analyst. Only answer using information grounded in the provided "
-        "Known Columns and any Sample Context included in the prompt. If the user asks about a "
-        "column or field that is not listed under Known Columns, you MUST clearly state that the "
-        "information is not available in the dataset. Respond in concise Markdown."
-    )
-
-    # Resolve model name from central config (env/secrets override supported), default gpt-5-mini
-    model_name = "gpt-5-mini"
-    if config is not None:
-        try:
-            model_name = config.get_model_name()
-        except Exception:
-            model_name = "gpt-5-mini"
+    model_name = _resolved_model_name()
 
     client = get_openai_client()
+    # Tiny deltas are coalesced so each yield escapes and renders a few words at once
+    buf: list[str] = []
+    buffered = 0
     try:
         stream = client.chat.completions.create(
             model=model_name,
             stream=True,
             messages=[
-                {"role": "system", "content": system_prompt},
+                _SYSTEM_MESSAGE_DATA_ANALYST,
                 {"role": "user", "content": f"{pre_prompt} {query_text}".strip()},
             ],
         )
@@ -461,17 +515,55 @@ def stream_query(df, query_text, pre_prompt):
             except Exception:
                 delta = ""
             if delta:
-                # Escape $ for Streamlit Markdown rendering safety
-                yield delta.replace("$", "\\$")
+                buf.append(delta)
+                buffered += len(delta)
+                if buffered >= _STREAM_FLUSH_CHARS:
+                    # Escape $ for Streamlit Markdown rendering safety
+                    yield "".join(buf).translate(_ESCAPE_TBL)
+                    buf.clear()
+                    buffered = 0
     except Exception as e:
         # Fallback single message if streaming path fails
+        if buf:
+            yield "".join(buf).translate(_ESCAPE_TBL)
+            buf.clear()
         yield f"[streaming unavailable] {e}"
+    if buf:
+        yield "".join(buf).translate(_ESCAPE_TBL)
+
+
+_MISSING_CELL_TEXT = frozenset({"nan", "<NA>", "NaT", "None"})
+
+
+def _md_cell(value) -> str:
+    """Format one table cell for a pipe table (no padding; the reader is the model)."""
+    if isinstance(value, float):
+        # 15 significant digits: whole amounts print without a trailing .0 or exponent
+        return "" if value != value else format(value, ".15g")
+    text = str(value)
+    if text in _MISSING_CELL_TEXT:
+        return ""
+    return text.replace("|", "\\|").replace("\n", " ")
 
 
 def _safe_markdown_table(df, max_rows: int = 20) -> str:
-    """Render a small table snippet in Markdown; fallback to plain text if unavailable."""
+    """Render a small table snippet in Markdown; fallback to plain text if unavailable.
+
+    Formats the pipe table directly instead of DataFrame.to_markdown, which needs the optional
+    tabulate package and pads every cell to column width.
+    """
     try:
-        return df.head(max_rows).to_markdown(index=False)
+        head = df.head(max_rows)
+        lines = [
+            "| " + " | ".join(_md_cell(c) for c in head.columns) + " |",
+            "|" + " --- |" * len(head.columns),
+        ]
+        # One object-array conversion is far cheaper than itertuples' per-row tuple building
+        lines.extend(
+            "| " + " | ".join(map(_md_cell, row)) + " |"
+            for row in head.to_numpy(dtype=object).tolist()
+        )
+        return "\n".join(lines)
     except Exception:
         try:
             return df.head(max_rows).to_string(index=False)
@@ -479,7 +571,63 @@ def _safe_markdown_table(df, max_rows: int = 20) -> str:
             return f"[table render error] {e}"
 
 
+# Comma-joined column names keyed by id(df.columns). pandas Index objects are immutable and
+# adding/renaming a column swaps in a new Index, so the weakref identity check is sufficient.
+_KNOWN_COLS_CACHE: dict[int, tuple[weakref.ref, str]] = {}
+_KNOWN_COLS_CACHE_SIZE = 8
+
+
+def _known_columns_text(df) -> str:
+    """Return the frame's column names joined with ', ', reused while the columns are unchanged."""
+    columns = getattr(df, "columns", [])
+    hit = _KNOWN_COLS_CACHE.get(id(columns))
+    if hit is not None and hit[0]() is columns:
+        return hit[1]
+    text = ", ".join(map(str, columns))
+    try:
+        ref = weakref.ref(columns)
+    except TypeError:
+        return text
+    if len(_KNOWN_COLS_CACHE) >= _KNOWN_COLS_CACHE_SIZE:
+        _KNOWN_COLS_CACHE.pop(next(iter(_KNOWN_COLS_CACHE)))
+    _KNOWN_COLS_CACHE[id(columns)] = (ref, text)
+    return text
+
+
+# Per-frame memo caches map id(df) -> (weakref, (len, columns), value). The weakref guards
+# against id reuse after a frame is collected; row count and columns guard against in-place
+# reshaping. Frames are treated as immutable otherwise (the app's preprocessed data is
+# cached as such). Each cache keeps its few most recently stored frames.
+def _frame_memo(cache: dict, size: int, df, compute: Callable[[Any], Any]):
+    """Return compute(df), reusing the value cached for this frame while its shape is unchanged."""
+    try:
+        shape = (len(df), tuple(df.columns))
+    except Exception:
+        return compute(df)
+    hit = cache.get(id(df))
+    if hit is not None and hit[0]() is df and hit[1] == shape:
+        return hit[2]
+    value = compute(df)
+    try:
+        ref = weakref.ref(df)
+    except TypeError:
+        return value
+    if len(cache) >= size:
+        cache.pop(next(iter(cache)), None)
+    cache[id(df)] = (ref, shape, value)
+    return value
+
+
+_DF_SUMMARY_CACHE: dict[int, tuple[weakref.ref, tuple[int, tuple], str]] = {}
+_DF_SUMMARY_CACHE_SIZE = 8
+
+
 def _summarize_df(df) -> str:
+    """Return a lightweight textual summary of the dataframe, reused across chat turns."""
+    return _frame_memo(_DF_SUMMARY_CACHE, _DF_SUMMARY_CACHE_SIZE, df, _compute_df_summary)
+
+
+def _compute_df_summary(df) -> str:
     """Return a lightweight textual summary of the dataframe for grounding."""
     try:
         cols = list(map(str, getattr(df, "columns", [])))
@@ -489,12 +637,19 @@ def _summarize_df(df) -> str:
         # Common numeric column summary if present
         try:
             if "amount_usd" in df.columns:
-                s = df["amount_usd"]
+                # Materialize the column once; NumPy reductions skip per-call pandas dispatch
+                values = df["amount_usd"].to_numpy(dtype="float64", na_value=np.nan)
+                values = values[~np.isnan(values)]
+                count = values.size
+                if count:
+                    total, lo, hi = values.sum(), values.min(), values.max()
+                    mean = total / count
+                else:
+                    total, mean, lo, hi = 0.0, np.nan, np.nan, np.nan
+                # NumPy scalars implement __format__, so no float() round-trips are needed
                 parts.append(
-                    "amount_usd stats: "
-                    f"count={int(s.count())}, sum={float(s.sum()):,.2f}, "
-                    f"mean={float(s.mean()):,.2f}, min={float(s.min()):,.2f}, "
-                    f"max={float(s.max()):,.2f}"
+                    f"amount_usd stats: count={count}, sum={total:,.2f}, "
+                    f"mean={mean:,.2f}, min={lo:,.2f}, max={hi:,.2f}"
                 )
         except Exception:
             pass
@@ -503,6 +658,64 @@ def _summarize_df(df) -> str:
         return ""
 
 
+# Numeric-column views and their correlation matrices. select_dtypes copies the numeric
+# blocks, so only a few frames are kept.
+_NUMERIC_VIEW_CACHE: dict[int, tuple[weakref.ref, tuple[int, tuple], Any]] = {}
+_NUMERIC_CORR_CACHE: dict[int, tuple[weakref.ref, tuple[int, tuple], Any]] = {}
+_NUMERIC_CACHE_SIZE = 4
+
+
+def _numeric_view(df):
+    """Return df.select_dtypes(include="number"), reused across tool calls on the same frame."""
+    return _frame_memo(
+        _NUMERIC_VIEW_CACHE,
+        _NUMERIC_CACHE_SIZE,
+        df,
+        lambda frame: frame.select_dtypes(include="number"),
+    )
+
+
+def _numeric_corr(df):
+    """Return the numeric correlation matrix, computed once per frame for any target column."""
+    return _frame_memo(
+        _NUMERIC_CORR_CACHE,
+        _NUMERIC_CACHE_SIZE,
+        df,
+        lambda frame: _numeric_view(frame).corr(numeric_only=True),
+    )
+
+
+# Grouping copies of recently seen frames: shallow copies whose repetitive string columns are
+# categoricals, so repeated groupby/pivot/value_counts calls reuse the codes instead of
+# hashing every string again. The caller's frame is never modified.
+_GROUPING_FRAME_CACHE: dict[int, tuple[weakref.ref, tuple[int, tuple], Any]] = {}
+_GROUPING_FRAME_CACHE_SIZE = 2
+
+
+def _categorize_repeated_strings(df):
+    """Return a shallow copy of df with string columns of < 50% distinct values as categories."""
+    out = df.copy(deep=False)
+    limit = 0.5 * len(df)
+    for col in df.columns:
+        try:
+            s = df[col]
+            if isinstance(s.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(s):
+                continue
+            if s.nunique(dropna=True) < limit:
+                out[col] = s.astype("category")
+        except Exception:
+            # Unhashable values or duplicate column labels: leave the column as is
+            continue
+    return out
+
+
+def _grouping_frame(df):
+    """Return df prepared for grouping (see _categorize_repeated_strings), cached per frame."""
+    return _frame_memo(
+        _GROUPING_FRAME_CACHE, _GROUPING_FRAME_CACHE_SIZE, df, _categorize_repeated_strings
+    )
+
+
 def _df_describe_tool(df, columns=None) -> str:
     """Tool: describe numeric columns or a provided subset of columns."""
     try:
@@ -511,9 +724,9 @@ def _df_describe_tool(df, columns=None) -> str:
             if use_cols:
                 target = df[use_cols]
             else:
-                target = df.select_dtypes(include="number")
+                target = _numeric_view(df)
         else:
-            target = df.select_dtypes(include="number")
+            target = _numeric_view(df)
         if target.shape[1] == 0:
             return "No numeric columns available for describe()."
         desc = target.describe().reset_index()
@@ -528,13 +741,12 @@ def _df_groupby_sum_tool(df, by, value, n: int = 10, ascending: bool = False) ->
         use_by = [c for c in (by or []) if c in df.columns]
         if not use_by or value not in df.columns:
             return f"[df_groupby_sum error] invalid columns; by={by}, value={value}"
-        res = (
-            df.groupby(use_by, dropna=False)[value]
-            .sum()
-            .sort_values(ascending=ascending)
-            .head(max(int(n or 10), 1))
-            .reset_index()
-        )
+        # observed=True skips empty categorical combinations; the top-n selection is a
+        # partial sort, so the (possibly large) group result is never fully sorted
+        frame = _grouping_frame(df)
+        sums = frame.groupby(use_by, dropna=False, observed=True, sort=False)[value].sum()
+        k = max(int(n or 10), 1)
+        res = (sums.nsmallest(k) if ascending else sums.nlargest(k)).reset_index()
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_groupby_sum error] {e}"
@@ -545,467 +757,456 @@ def _df_top_n_tool(df, by, n: int = 10, ascending: bool = False) -> str:
     try:
         if by not in df.columns:
             return f"[df_top_n error] invalid column: {by}"
-        res = df.sort_values(by=by, ascending=ascending).head(max(int(n or 10), 1))
+        k = max(int(n or 10), 1)
+        try:
+            # Partial selection instead of a full sort; numeric columns only
+            res = df.nsmallest(k, by) if ascending else df.nlargest(k, by)
+        except TypeError:
+            res = df.sort_values(by=by, ascending=ascending).head(k)
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_top_n error] {e}"
 
 
-def tool_query(df, query_text: str, pre_prompt: str, extra_ctx: str | None = None) -> str:
-    """Non-streaming, tool-assisted query with safe, whitelisted DataFrame operations.
-
-    This provides the LLM with function-call tools instead of executing generated Python code.
-    It preserves the 'investigate the data' capability without using eval/safe_eval.
-    """
-    # Initialize model settings (best-effort)
-    try:
-        setup_llama_index()
-    except Exception:
-        pass
-    try:
-        print("[AI][tool_query] active", flush=True)
-    except Exception:
-        pass
-
-    system_prompt = (
-        "You are a helpful data analyst. Use the provided tools to inspect the dataframe "
-        "when you need specific numbers or slices. Only answer using information grounded "
-        "in the Known Columns, the tool outputs, and any Additional Chart Context. If the "
-        "user asks about a column not listed, clearly state that it is not available. "
-        "Respond in concise Markdown."
-    )
-
-    # Resolve model
-    model_name = "gpt-5-mini"
-    if config is not None:
-        try:
-            model_name = config.get_model_name()
-        except Exception:
-            model_name = "gpt-5-mini"
-
-    # Build grounded user content (prepend compact 'User Context' when available)
-    df_summary = _summarize_df(df)
-    ctx_parts: list[str] = []
-    wedge = _build_user_context_wedge()
-    if wedge:
-        try:
-            print("[AI][user_context_injected]=true", flush=True)
-        except Exception:
-            pass
-        ctx_parts.append(wedge)
-    # Compact planner/budget wedge (when present)
-    try:
-        pb_wedge = _build_planner_budget_wedge()
-    except Exception:
-        pb_wedge = None
-    if pb_wedge:
-        ctx_parts.append(pb_wedge)
-    ctx_parts.append(pre_prompt)
-    if extra_ctx:
-        ctx_parts.append(f"Additional Chart Context: {extra_ctx}")
-    if df_summary:
-        ctx_parts.append(df_summary)
-    user_content = " ".join(p for p in ctx_parts if p).strip()
-    if query_text:
-        user_content = f"{user_content} {query_text}".strip()
-
-    # Define tool schemas for OpenAI function calling
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "df_describe",
-                "description": "Describe basic statistics for numeric columns (or specific columns).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "columns": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional list of column names to include.",
-                        }
-                    },
-                    "required": [],
+# Tool schemas for OpenAI function calling (static; shared by every tool_query call)
+_TOOL_SCHEMAS: list[dict[str, Any]] = [
+    {
+        "type": "function",
+        "function": {
+            "name": "df_describe",
+            "description": "Describe basic statistics for numeric columns (or specific columns).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "columns": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Optional list of column names to include.",
+                    }
                 },
+                "required": [],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_groupby_sum",
-                "description": "Group by columns, sum a numeric column, sort and return the top n groups.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "by": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of columns to group by.",
-                        },
-                        "value": {
-                            "type": "string",
-                            "description": "Numeric column to aggregate via sum.",
-                        },
-                        "n": {
-                            "type": "integer",
-                            "description": "Number of groups to return.",
-                            "default": 10,
-                            "minimum": 1,
-                        },
-                        "ascending": {
-                            "type": "boolean",
-                            "description": "Sort ascending if true; default descending.",
-                            "default": False,
-                        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_groupby_sum",
+            "description": "Group by columns, sum a numeric column, sort and return the top n groups.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "by": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "List of columns to group by.",
+                    },
+                    "value": {
+                        "type": "string",
+                        "description": "Numeric column to aggregate via sum.",
+                    },
+                    "n": {
+                        "type": "integer",
+                        "description": "Number of groups to return.",
+                        "default": 10,
+                        "minimum": 1,
+                    },
+                    "ascending": {
+                        "type": "boolean",
+                        "description": "Sort ascending if true; default descending.",
+                        "default": False,
                     },
-                    "required": ["by", "value"],
                 },
+                "required": ["by", "value"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_top_n",
-                "description": "Return the top n rows sorted by a given column.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "by": {"type": "string", "description": "Column name to sort by."},
-                        "n": {
-                            "type": "integer",
-                            "description": "Number of rows to return.",
-                            "default": 10,
-                            "minimum": 1,
-                        },
-                        "ascending": {
-                            "type": "boolean",
-                            "description": "Sort ascending if true; default descending.",
-                            "default": False,
-                        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_top_n",
+            "description": "Return the top n rows sorted by a given column.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "by": {"type": "string", "description": "Column name to sort by."},
+                    "n": {
+                        "type": "integer",
+                        "description": "Number of rows to return.",
+                        "default": 10,
+                        "minimum": 1,
+                    },
+                    "ascending": {
+                        "type": "boolean",
+                        "description": "Sort ascending if true; default descending.",
+                        "default": False,
                     },
-                    "required": ["by"],
                 },
+                "required": ["by"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_value_counts",
-                "description": "Frequency distribution for a categorical field (optionally normalized).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "column": {"type": "string"},
-                        "n": {"type": "integer", "default": 20, "minimum": 1},
-                        "normalize": {"type": "boolean", "default": False},
-                    },
-                    "required": ["column"],
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_value_counts",
+            "description": "Frequency distribution for a categorical field (optionally normalized).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string"},
+                    "n": {"type": "integer", "default": 20, "minimum": 1},
+                    "normalize": {"type": "boolean", "default": False},
                 },
+                "required": ["column"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_unique",
-                "description": "Sample of unique values from a column.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "column": {"type": "string"},
-                        "n": {"type": "integer", "default": 100, "minimum": 1},
-                    },
-                    "required": ["column"],
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_unique",
+            "description": "Sample of unique values from a column.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string"},
+                    "n": {"type": "integer", "default": 100, "minimum": 1},
                 },
+                "required": ["column"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_filter_equals",
-                "description": "Filter rows where df[column] == value (exact match).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "column": {"type": "string"},
-                        "value": {
-                            "anyOf": [{"type": "string"}, {"type": "number"}, {"type": "boolean"}]
-                        },
-                        "limit": {"type": "integer", "default": 50, "minimum": 1},
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_filter_equals",
+            "description": "Filter rows where df[column] == value (exact match).",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string"},
+                    "value": {
+                        "anyOf": [{"type": "string"}, {"type": "number"}, {"type": "boolean"}]
                     },
-                    "required": ["column", "value"],
+                    "limit": {"type": "integer", "default": 50, "minimum": 1},
                 },
+                "required": ["column", "value"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_filter_in",
-                "description": "Filter rows where df[column] is in a list of values.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "column": {"type": "string"},
-                        "values": {
-                            "type": "array",
-                            "items": {
-                                "anyOf": [
-                                    {"type": "string"},
-                                    {"type": "number"},
-                                    {"type": "boolean"},
-                                ]
-                            },
-                            "description": "Non-empty list of values to match.",
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_filter_in",
+            "description": "Filter rows where df[column] is in a list of values.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string"},
+                    "values": {
+                        "type": "array",
+                        "items": {
+                            "anyOf": [
+                                {"type": "string"},
+                                {"type": "number"},
+                                {"type": "boolean"},
+                            ]
                         },
-                        "limit": {"type": "integer", "default": 50, "minimum": 1},
+                        "description": "Non-empty list of values to match.",
                     },
-                    "required": ["column", "values"],
+                    "limit": {"type": "integer", "default": 50, "minimum": 1},
                 },
+                "required": ["column", "values"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_filter_range",
-                "description": "Numeric range filter for a column between min_value and max_value.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "column": {"type": "string"},
-                        "min_value": {"anyOf": [{"type": "number"}, {"type": "null"}]},
-                        "max_value": {"anyOf": [{"type": "number"}, {"type": "null"}]},
-                        "limit": {"type": "integer", "default": 50, "minimum": 1},
-                    },
-                    "required": ["column"],
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_filter_range",
+            "description": "Numeric range filter for a column between min_value and max_value.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "column": {"type": "string"},
+                    "min_value": {"anyOf": [{"type": "number"}, {"type": "null"}]},
+                    "max_value": {"anyOf": [{"type": "number"}, {"type": "null"}]},
+                    "limit": {"type": "integer", "default": 50, "minimum": 1},
                 },
+                "required": ["column"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_pivot_table",
-                "description": "Pivot across index x columns for a numeric value with an aggregation.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "index": {"type": "array", "items": {"type": "string"}, "default": []},
-                        "columns": {"type": "array", "items": {"type": "string"}, "default": []},
-                        "value": {"type": "string"},
-                        "agg": {
-                            "type": "string",
-                            "enum": ["sum", "mean", "count"],
-                            "default": "sum",
-                        },
-                        "top": {"type": "integer", "default": 20, "minimum": 1},
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_pivot_table",
+            "description": "Pivot across index x columns for a numeric value with an aggregation.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "array", "items": {"type": "string"}, "default": []},
+                    "columns": {"type": "array", "items": {"type": "string"}, "default": []},
+                    "value": {"type": "string"},
+                    "agg": {
+                        "type": "string",
+                        "enum": ["sum", "mean", "count"],
+                        "default": "sum",
                     },
-                    "required": ["value"],
+                    "top": {"type": "integer", "default": 20, "minimum": 1},
                 },
+                "required": ["value"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_corr_top",
-                "description": "Top absolute correlations with a numeric target.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "target": {"type": "string"},
-                        "n": {"type": "integer", "default": 5, "minimum": 1},
-                    },
-                    "required": ["target"],
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_corr_top",
+            "description": "Top absolute correlations with a numeric target.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "target": {"type": "string"},
+                    "n": {"type": "integer", "default": 5, "minimum": 1},
                 },
+                "required": ["target"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "df_sql_select",
-                "description": "Run read-only SELECT/WITH SQL on the dataframe via DuckDB (table name: t). Returns a small table.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "sql": {
-                            "type": "string",
-                            "description": "SELECT/WITH query referencing table 't'",
-                        },
-                        "limit": {"type": "integer", "default": 50, "minimum": 1},
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "df_sql_select",
+            "description": "Run read-only SELECT/WITH SQL on the dataframe via DuckDB (table name: t). Returns a small table.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "sql": {
+                        "type": "string",
+                        "description": "SELECT/WITH query referencing table 't'",
                     },
-                    "required": ["sql"],
+                    "limit": {"type": "integer", "default": 50, "minimum": 1},
                 },
+                "required": ["sql"],
             },
         },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_chart_state",
-                "description": "Return JSON describing current chart state (chart_id and placeholders for filters).",
-                "parameters": {"type": "object", "properties": {}, "required": []},
-            },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_chart_state",
+            "description": "Return JSON describing current chart state (chart_id and placeholders for filters).",
+            "parameters": {"type": "object", "properties": {}, "required": []},
         },
-    ]
+    },
+]
+
+
+# First-round tool plans (assistant content + tool_calls) keyed by a digest of the model and
+# prompt, remembered for the frame they were planned against (weakref + shape guard).
+_TOOL_PLAN_CACHE: dict[bytes, tuple[weakref.ref, tuple[int, tuple], tuple[str, list]]] = {}
+_TOOL_PLAN_CACHE_SIZE = 64
+
+
+def _tool_plan_key(model_name: str, user_content: str) -> bytes:
+    """Digest identifying one tool_query prompt (the system prompt is part of the input)."""
+    text = "\0".join((model_name, _SYSTEM_PROMPT_TOOL_ANALYST, user_content))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _cached_tool_plan(key: bytes, df) -> tuple[str, list] | None:
+    """Return the cached plan for key if it was made for this very frame, else None."""
+    hit = _TOOL_PLAN_CACHE.get(key)
+    if hit is None or hit[0]() is not df:
+        return None
+    try:
+        if hit[1] != (len(df), tuple(df.columns)):
+            return None
+    except Exception:
+        return None
+    return hit[2]
+
+
+def _store_tool_plan(key: bytes, df, plan: tuple[str, list]) -> None:
+    """Remember a plan for df; frames that can't be weak-referenced or sized are skipped."""
+    try:
+        entry = (weakref.ref(df), (len(df), tuple(df.columns)), plan)
+    except Exception:
+        return
+    if len(_TOOL_PLAN_CACHE) >= _TOOL_PLAN_CACHE_SIZE:
+        _TOOL_PLAN_CACHE.pop(next(iter(_TOOL_PLAN_CACHE)), None)
+    _TOOL_PLAN_CACHE[key] = entry
+
+
+def tool_query(
+    df,
+    query_text: str,
+    pre_prompt: str,
+    extra_ctx: str | None = None,
+    on_delta: Callable[[str], None] | None = None,
+) -> str:
+    """Tool-assisted query with safe, whitelisted DataFrame operations.
+
+    This provides the LLM with function-call tools instead of executing generated Python code.
+    It preserves the 'investigate the data' capability without using eval/safe_eval.
+    When on_delta is given, the final answer after tool calls is streamed and on_delta receives
+    the escaped answer so far after each flushed chunk; the full answer is still returned.
+    """
+    # Initialize model settings (best-effort)
+    try:
+        setup_llama_index()
+    except Exception:
+        pass
+    try:
+        print("[AI][tool_query] active", flush=True)
+    except Exception:
+        pass
+
+    model_name = _resolved_model_name()
+
+    # Build grounded user content from most to least stable (see query_data): dataset summary,
+    # page prompt and chart context, then the 'User Context'/planner wedges, query last
+    df_summary = _summarize_df(df)
+    ctx_parts: list[str] = [df_summary, pre_prompt]
+    if extra_ctx:
+        ctx_parts.append(f"Additional Chart Context: {extra_ctx}")
+    wedge = _build_user_context_wedge()
+    if wedge:
+        try:
+            print("[AI][user_context_injected]=true", flush=True)
+        except Exception:
+            pass
+        ctx_parts.append(wedge)
+    # Compact planner/budget wedge (when present)
+    try:
+        pb_wedge = _build_planner_budget_wedge()
+    except Exception:
+        pb_wedge = None
+    if pb_wedge:
+        ctx_parts.append(pb_wedge)
+    user_content = " ".join(p for p in ctx_parts if p).strip()
+    if query_text:
+        user_content = f"{user_content} {query_text}".strip()
 
     client = get_openai_client()
     messages: list[dict[str, Any]] = [
-        {"role": "system", "content": system_prompt},
+        _SYSTEM_MESSAGE_TOOL_ANALYST,
         {"role": "user", "content": user_content},
     ]
 
     try:
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=cast(Iterable[ChatCompletionMessageParam], messages),
-            tools=cast(Iterable[ChatCompletionToolParam], tools),
-            tool_choice="auto",
-        )
-        msg = resp.choices[0].message
-        tool_calls = getattr(msg, "tool_calls", None)
+        # A repeated question on the same frame reuses the model's earlier tool plan and skips
+        # the first round-trip; the tools themselves still run against the current data
+        plan_key = _tool_plan_key(model_name, user_content)
+        plan = _cached_tool_plan(plan_key, df)
+        if plan is None:
+            resp = client.chat.completions.create(
+                model=model_name,
+                messages=cast("Iterable[ChatCompletionMessageParam]", messages),
+                tools=cast("Iterable[ChatCompletionToolParam]", _TOOL_SCHEMAS),
+                tool_choice="auto",
+            )
+            msg = resp.choices[0].message
+            # The SDK message model always defines content and tool_calls (None when unused)
+            tool_calls = msg.tool_calls
+            content = msg.content or ""
+            if not tool_calls:
+                # No tool calls; just return the content
+                return content.translate(_ESCAPE_TBL)
+            plan = (
+                content,
+                [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {
+                            "name": tc.function.name,
+                            "arguments": tc.function.arguments,
+                        },
+                    }
+                    for tc in tool_calls
+                ],
+            )
+            _store_tool_plan(plan_key, df, plan)
+
+        # Preserve assistant message with tool calls
+        plan_content, plan_calls = plan
+        messages.append({"role": "assistant", "content": plan_content, "tool_calls": plan_calls})
 
-        if tool_calls:
-            # Preserve assistant message with tool calls
+        # Parse every tool call first, then run them (independent tools concurrently)
+        calls: list[tuple[str, dict[str, Any]]] = []
+        for tc in plan_calls:
+            name = tc["function"]["name"]
+            try:
+                print(f"[AI][tool_query] dispatch: {name}", flush=True)
+            except Exception:
+                pass
+            try:
+                args = json.loads(tc["function"]["arguments"] or "{}")
+            except Exception:
+                args = {}
+            calls.append((name, args))
+
+        # Tool results must follow the assistant's tool_calls order
+        for tc, content in zip(plan_calls, _run_tool_calls(df, calls), strict=True):
             messages.append(
                 {
-                    "role": "assistant",
-                    "content": (msg.content or ""),
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments,
-                            },
-                        }
-                        for tc in tool_calls
-                    ],
+                    "role": "tool",
+                    "tool_call_id": tc["id"],
+                    "content": content,
                 }
             )
 
-            # Dispatch each tool call safely
-            for tc in tool_calls:
-                name = tc.function.name
-                try:
-                    print(f"[AI][tool_query] dispatch: {name}", flush=True)
-                except Exception:
-                    pass
-                try:
-                    import json  # local import to avoid global import changes
-
-                    args = json.loads(tc.function.arguments or "{}")
-                except Exception:
-                    args = {}
-
-                if name == "df_describe":
-                    content = _df_describe_tool(df, args.get("columns"))
-                elif name == "df_groupby_sum":
-                    content = _df_groupby_sum_tool(
-                        df,
-                        args.get("by", []),
-                        args.get("value") or "",
-                        args.get("n", 10),
-                        args.get("ascending", False),
-                    )
-                elif name == "df_top_n":
-                    content = _df_top_n_tool(
-                        df,
-                        args.get("by") or "",
-                        args.get("n", 10),
-                        args.get("ascending", False),
-                    )
-                elif name == "df_value_counts":
-                    content = _df_value_counts_tool(
-                        df,
-                        args.get("column") or "",
-                        args.get("n", 20),
-                        args.get("normalize", False),
-                    )
-                elif name == "df_unique":
-                    content = _df_unique_tool(
-                        df,
-                        args.get("column") or "",
-                        args.get("n", 100),
-                    )
-                elif name == "df_filter_equals":
-                    content = _df_filter_equals_tool(
-                        df,
-                        args.get("column") or "",
-                        args.get("value"),
-                        args.get("limit", 50),
-                    )
-                elif name == "df_filter_in":
-                    content = _df_filter_in_tool(
-                        df,
-                        args.get("column") or "",
-                        args.get("values") or [],
-                        args.get("limit", 50),
-                    )
-                elif name == "df_filter_range":
-                    content = _df_filter_range_tool(
-                        df,
-                        args.get("column") or "",
-                        args.get("min_value"),
-                        args.get("max_value"),
-                        args.get("limit", 50),
-                    )
-                elif name == "df_pivot_table":
-                    content = _df_pivot_table_tool(
-                        df,
-                        args.get("index") or [],
-                        args.get("columns") or [],
-                        args.get("value") or "",
-                        args.get("agg", "sum"),
-                        args.get("top", 20),
-                    )
-                elif name == "df_corr_top":
-                    content = _df_corr_top_tool(
-                        df,
-                        args.get("target") or "",
-                        args.get("n", 5),
-                    )
-                elif name == "df_sql_select":
-                    content = _df_sql_select_tool(
-                        df,
-                        args.get("sql", ""),
-                        args.get("limit", 50),
-                    )
-                elif name == "get_chart_state":
-                    content = _get_chart_state_tool()
-                else:
-                    content = f"[unknown tool: {name}]"
-
-                messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tc.id,
-                        "content": content,
-                    }
-                )
-
-            # Get the final model answer after tool outputs
-            resp2 = client.chat.completions.create(
-                model=model_name,
-                messages=cast(Iterable[ChatCompletionMessageParam], messages),
-            )
-            content = getattr(resp2.choices[0].message, "content", "") or ""
-            return content.replace("$", "\\$")
-        else:
-            # No tool calls; just return the content
-            content = getattr(msg, "content", "") or ""
-            return content.replace("$", "\\$")
+        # Get the final model answer after tool outputs
+        if on_delta is not None:
+            return _stream_final_answer(client, model_name, messages, on_delta)
+        resp2 = client.chat.completions.create(
+            model=model_name,
+            messages=cast("Iterable[ChatCompletionMessageParam]", messages),
+        )
+        content = resp2.choices[0].message.content or ""
+        return content.translate(_ESCAPE_TBL)
     except Exception as e:
         return f"Tool-assisted query error: {e}"
 
 
+def _stream_final_answer(client, model_name: str, messages: list, on_delta) -> str:
+    """Stream the post-tool answer, reporting the escaped text so far to on_delta."""
+    stream = client.chat.completions.create(
+        model=model_name,
+        messages=cast("Iterable[ChatCompletionMessageParam]", messages),
+        stream=True,
+    )
+    parts: list[str] = []
+    pending = 0
+    for chunk in stream:
+        try:
+            delta = chunk.choices[0].delta.content or ""
+        except Exception:
+            delta = ""
+        if delta:
+            parts.append(delta.translate(_ESCAPE_TBL))
+            pending += len(delta)
+            if pending >= _STREAM_FLUSH_CHARS:
+                on_delta("".join(parts))
+                pending = 0
+    answer = "".join(parts)
+    if pending:
+        on_delta(answer)
+    return answer
+
+
 def _df_value_counts_tool(df, column: str, n: int = 20, normalize: bool = False) -> str:
     """Tool: value counts for a column (optionally normalized)."""
     try:
         if column not in df.columns:
             return f"[df_value_counts error] invalid column: {column}"
-        try:
-            import pandas as pd  # local import to avoid global side-effects
-        except Exception:
-            return "[df_value_counts error] pandas not available"
-        s = df[column]
-        vc = s.value_counts(normalize=bool(normalize), dropna=False).head(max(int(n or 20), 1))
+        s = _grouping_frame(df)[column]
+        # Count without sorting, then select the top n (partial sort over the unique values)
+        vc = s.value_counts(normalize=bool(normalize), dropna=False, sort=False)
+        vc = vc.nlargest(max(int(n or 20), 1))
         col_name = "proportion" if normalize else "count"
         res = pd.DataFrame({str(column): vc.index.astype(str), col_name: vc.values})
         return _safe_markdown_table(res)
@@ -1018,24 +1219,29 @@ def _df_unique_tool(df, column: str, n: int = 100) -> str:
     try:
         if column not in df.columns:
             return f"[df_unique error] invalid column: {column}"
-        try:
-            import pandas as pd
-        except Exception:
-            return "[df_unique error] pandas not available"
-        uniq = df[column].dropna().astype(str).unique().tolist()
-        uniq = uniq[: max(int(n or 100), 1)]
-        res = pd.DataFrame({"value": uniq})
+        # Unique first (hash pass, first-seen order), then stringify only the n kept values
+        uniq = df[column].dropna().unique()[: max(int(n or 100), 1)]
+        res = pd.DataFrame({"value": [str(v) for v in uniq]})
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_unique error] {e}"
 
 
+def _first_matching_rows(df, mask, limit: int):
+    """Return the first `limit` rows where mask is True, copying only those rows.
+
+    Boolean indexing would copy every matching row (all columns) before head() drops them.
+    """
+    hits = mask.to_numpy(dtype=bool, na_value=False).nonzero()[0]
+    return df.iloc[hits[: max(int(limit or 50), 1)]]
+
+
 def _df_filter_equals_tool(df, column: str, value: Any, limit: int = 50) -> str:
     """Tool: filter rows where df[column] == value (exact match)."""
     try:
         if column not in df.columns:
             return f"[df_filter_equals error] invalid column: {column}"
-        res = df[df[column] == value].head(max(int(limit or 50), 1))
+        res = _first_matching_rows(df, df[column].eq(value), limit)
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_filter_equals error] {e}"
@@ -1048,7 +1254,7 @@ def _df_filter_in_tool(df, column: str, values: list[Any] | None = None, limit:
             return f"[df_filter_in error] invalid column: {column}"
         if not isinstance(values, list) or not values:
             return "[df_filter_in error] 'values' must be a non-empty list"
-        res = df[df[column].isin(values)].head(max(int(limit or 50), 1))
+        res = _first_matching_rows(df, df[column].isin(values), limit)
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_filter_in error] {e}"
@@ -1062,25 +1268,16 @@ def _df_filter_range_tool(
         if column not in df.columns:
             return f"[df_filter_range error] invalid column: {column}"
         try:
-            import pandas as pd
+            lo = float(min_value) if min_value is not None else -float("inf")
         except Exception:
-            return "[df_filter_range error] pandas not available"
+            return f"[df_filter_range error] min_value not comparable: {min_value}"
+        try:
+            hi = float(max_value) if max_value is not None else float("inf")
+        except Exception:
+            return f"[df_filter_range error] max_value not comparable: {max_value}"
+        # One coercion and one fused mask (NaN never falls between the bounds)
         s = pd.to_numeric(df[column], errors="coerce")
-        # If conversion failed (object), try coercing to numeric with NaNs allowed
-        if not hasattr(s, "dtype") or getattr(s.dtype, "kind", "") not in ("i", "u", "f"):
-            s = pd.to_numeric(df[column], errors="coerce")
-        mask = s.notna()
-        if min_value is not None:
-            try:
-                mask &= s >= float(min_value)
-            except Exception:
-                return f"[df_filter_range error] min_value not comparable: {min_value}"
-        if max_value is not None:
-            try:
-                mask &= s <= float(max_value)
-            except Exception:
-                return f"[df_filter_range error] max_value not comparable: {max_value}"
-        res = df[mask].head(max(int(limit or 50), 1))
+        res = _first_matching_rows(df, s.between(lo, hi, inclusive="both"), limit)
         return _safe_markdown_table(res)
     except Exception as e:
         return f"[df_filter_range error] {e}"
@@ -1096,17 +1293,20 @@ def _df_pivot_table_tool(
 ) -> str:
     """Tool: pivot table across index x columns for a numeric value with an aggregation."""
     try:
-        try:
-            import pandas as pd
-        except Exception:
-            return "[df_pivot_table error] pandas not available"
         index = index or []
         columns = columns or []
         if value is None or value not in df.columns:
             return f"[df_pivot_table error] invalid value column: {value}"
         allowed_aggs = {"sum": "sum", "mean": "mean", "count": "count"}
         aggfunc_param = cast(Any, allowed_aggs.get(str(agg).lower(), "sum"))
-        pt = pd.pivot_table(df, index=index, columns=columns, values=value, aggfunc=aggfunc_param)
+        pt = pd.pivot_table(
+            _grouping_frame(df),
+            index=index,
+            columns=columns,
+            values=value,
+            aggfunc=aggfunc_param,
+            observed=True,
+        )
         pt = pt.fillna(0)
         # Flatten columns for readability
         if hasattr(pt.columns, "levels"):
@@ -1124,14 +1324,10 @@ def _df_corr_top_tool(df, target: str, n: int = 5) -> str:
     try:
         if target not in df.columns:
             return f"[df_corr_top error] invalid target column: {target}"
-        try:
-            pass
-        except Exception:
-            return "[df_corr_top error] pandas not available"
-        num = df.select_dtypes(include="number")
+        num = _numeric_view(df)
         if target not in num.columns:
             return f"[df_corr_top error] target is not numeric: {target}"
-        corr = num.corr(numeric_only=True)
+        corr = _numeric_corr(df)
         if target not in corr.columns:
             return f"[df_corr_top error] cannot compute correlations for: {target}"
         s = corr[target].drop(labels=[target], errors="ignore").dropna()
@@ -1145,6 +1341,47 @@ def _df_corr_top_tool(df, target: str, n: int = 5) -> str:
         return f"[df_corr_top error] {e}"
 
 
+# One DuckDB connection per recently queried frame, with the frame registered as 't', so
+# repeated SQL tool calls skip connect + register. The registration holds a strong reference
+# to the frame (an id can't be reused while cached), which is why only two are kept. A
+# connection is not safe for concurrent queries, so each carries its own lock.
+_DUCKDB_CONN_CACHE: dict[int, tuple[tuple[int, tuple], Any, threading.Lock]] = {}
+_DUCKDB_CONN_CACHE_SIZE = 2
+_DUCKDB_CONN_CACHE_LOCK = threading.Lock()
+
+
+def _duckdb_connection(duckdb, df) -> tuple[Any, threading.Lock]:
+    """Return (connection, lock) with df registered as table 't', reusing a cached connection."""
+    shape = (len(df), tuple(df.columns))
+    with _DUCKDB_CONN_CACHE_LOCK:
+        hit = _DUCKDB_CONN_CACHE.get(id(df))
+        if hit is not None:
+            if hit[0] != shape:
+                # Columns or rows changed in place: refresh the registration
+                with hit[2]:
+                    hit[1].register("t", df)
+                _DUCKDB_CONN_CACHE[id(df)] = (shape, hit[1], hit[2])
+            return hit[1], hit[2]
+        con = duckdb.connect()
+        con.register("t", df)
+        lock = threading.Lock()
+        if len(_DUCKDB_CONN_CACHE) >= _DUCKDB_CONN_CACHE_SIZE:
+            _shape, old_con, old_lock = _DUCKDB_CONN_CACHE.pop(next(iter(_DUCKDB_CONN_CACHE)))
+            with old_lock:
+                old_con.close()
+        _DUCKDB_CONN_CACHE[id(df)] = (shape, con, lock)
+        return con, lock
+
+
+# Statements/keywords that could write, load or reconfigure; matched as whole words so tabs,
+# newlines and parentheses cannot slip them past. REPLACE followed by "(" is the string
+# function, which stays allowed.
+_SQL_FORBIDDEN = re.compile(
+    r"\b(?:insert|update|delete|create|alter|drop|attach|copy|merge|vacuum|pragma)\b"
+    r"|\breplace\b(?!\s*\()"
+)
+
+
 def _df_sql_select_tool(df, sql: str, limit: int = 50) -> str:
     """Tool: run a read-only SELECT/WITH query via DuckDB against registered table 't'."""
     try:
@@ -1153,55 +1390,74 @@ def _df_sql_select_tool(df, sql: str, limit: int = 50) -> str:
             return "[df_sql_select error] only SELECT/WITH queries are allowed"
         if ";" in lower:
             return "[df_sql_select error] semicolons are not allowed"
-        forbidden = (
-            " insert ",
-            " update ",
-            " delete ",
-            " create ",
-            " alter ",
-            " drop ",
-            " attach ",
-            " copy ",
-            " replace ",
-            " merge ",
-            " vacuum ",
-            " pragma ",
-        )
-        if any(tok in f" {lower} " for tok in forbidden):
+        if _SQL_FORBIDDEN.search(lower):
             return "[df_sql_select error] disallowed keyword detected"
         try:
             import duckdb  # type: ignore
         except Exception:
             return "[df_sql_select error] duckdb not installed. Try: pip install duckdb"
-        con = duckdb.connect()
-        try:
-            con.register("t", df)
-            capped = max(int(limit or 50), 1)
-            safe_sql = f"SELECT * FROM ({sql}) AS sub LIMIT {capped}"
+        capped = max(int(limit or 50), 1)
+        safe_sql = f"SELECT * FROM ({sql}) AS sub LIMIT {capped}"
+        con, lock = _duckdb_connection(duckdb, df)
+        with lock:
             res_df = con.execute(safe_sql).df()
-        finally:
-            con.close()
         return _safe_markdown_table(res_df)
     except Exception as e:
         return f"[df_sql_select error] {e}"
 
 
+# Page-level filters reported by get_chart_state: chart_id -> {filter name: session_state key}.
+# Charts not listed here (e.g. relationships.description_vs_amount) report no filters.
+_CHART_FILTER_KEYS: dict[str, dict[str, str]] = {
+    "distribution.main": {
+        "metric": "dist_metric",
+        "top_n": "dist_top_n",
+        "log_y": "dist_log_y",
+        "sort_dir": "dist_sort_dir",
+        "selected_clusters": "dist_selected_clusters",
+    },
+    "scatter.main": {
+        "start_year": "scatter_start_year",
+        "end_year": "scatter_end_year",
+        "selected_clusters": "scatter_clusters",
+        "marker_size": "scatter_marker_size",
+        "opacity": "scatter_opacity",
+        "log_y": "scatter_log_y",
+    },
+    "heatmap.main": {
+        "dimension1": "heatmap_dimension1",
+        "dimension2": "heatmap_dimension2",
+        "selected_values1": "heatmap_values1",
+        "selected_values2": "heatmap_values2",
+        "normalize": "heatmap_normalize",
+        "colorscale": "heatmap_colorscale",
+    },
+    "treemaps.main": {
+        "analyze_column": "treemap_analyze_column",
+        "selected_label": "treemap_selected_label",
+    },
+    "data_summary.top_funders": {"top_n": "ds_top_n"},
+    "relationships.avg_by_factor": {
+        "selected_factor": "rel_selected_factor",
+        "chart_type": "rel_chart_type",
+    },
+    "relationships.funder_affinity": {
+        "selected_funder": "rel_selected_funder",
+        "affinity_factor": "rel_selected_affinity_factor",
+    },
+    "top_categories.main": {
+        "selected_categorical": "topcat_selected_categorical",
+        "top_n": "topcat_top_n",
+        "chart_type": "topcat_chart_type",
+        "sort_order": "topcat_sort_order",
+    },
+}
+
+
 def _get_chart_state_tool() -> str:
     """Tool: return JSON describing current chart state (chart_id and known page-level filters)."""
     try:
-        import json
-        from typing import Any
-
-        # Try both import paths for app_state getter
-        try:
-            from utils.app_state import get_selected_chart as _get_sel  # type: ignore
-        except Exception:
-            try:
-                from GrantScope.utils.app_state import (
-                    get_selected_chart as _get_sel,  # type: ignore
-                )
-            except Exception:
-                _get_sel = None  # type: ignore
+        _get_sel = _app_state_getter("get_selected_chart")
 
         # Resolve chart id from global app state
         try:
@@ -1209,71 +1465,9 @@ def _get_chart_state_tool() -> str:
         except Exception:
             cid = None
 
-        filters: dict[str, Any] = {}
         try:
-            # Distribution page filters
-            if cid == "distribution.main":
-                filters = {
-                    "metric": st.session_state.get("dist_metric"),
-                    "top_n": st.session_state.get("dist_top_n"),
-                    "log_y": st.session_state.get("dist_log_y"),
-                    "sort_dir": st.session_state.get("dist_sort_dir"),
-                    "selected_clusters": st.session_state.get("dist_selected_clusters"),
-                }
-            # Scatter page filters
-            elif cid == "scatter.main":
-                filters = {
-                    "start_year": st.session_state.get("scatter_start_year"),
-                    "end_year": st.session_state.get("scatter_end_year"),
-                    "selected_clusters": st.session_state.get("scatter_clusters"),
-                    "marker_size": st.session_state.get("scatter_marker_size"),
-                    "opacity": st.session_state.get("scatter_opacity"),
-                    "log_y": st.session_state.get("scatter_log_y"),
-                }
-            # Heatmap page filters
-            elif cid == "heatmap.main":
-                filters = {
-                    "dimension1": st.session_state.get("heatmap_dimension1"),
-                    "dimension2": st.session_state.get("heatmap_dimension2"),
-                    "selected_values1": st.session_state.get("heatmap_values1"),
-                    "selected_values2": st.session_state.get("heatmap_values2"),
-                    "normalize": st.session_state.get("heatmap_normalize"),
-                    "colorscale": st.session_state.get("heatmap_colorscale"),
-                }
-            # Treemaps page filters
-            elif cid == "treemaps.main":
-                filters = {
-                    "analyze_column": st.session_state.get("treemap_analyze_column"),
-                    "selected_label": st.session_state.get("treemap_selected_label"),
-                }
-            # Data Summary — Top Funders
-            elif cid == "data_summary.top_funders":
-                filters = {
-                    "top_n": st.session_state.get("ds_top_n"),
-                }
-            # Relationships page filters
-            elif cid == "relationships.description_vs_amount":
-                filters = {}
-            elif cid == "relationships.avg_by_factor":
-                filters = {
-                    "selected_factor": st.session_state.get("rel_selected_factor"),
-                    "chart_type": st.session_state.get("rel_chart_type"),
-                }
-            elif cid == "relationships.funder_affinity":
-                filters = {
-                    "selected_funder": st.session_state.get("rel_selected_funder"),
-                    "affinity_factor": st.session_state.get("rel_selected_affinity_factor"),
-                }
-            # Top Categories page filters
-            elif cid == "top_categories.main":
-                filters = {
-                    "selected_categorical": st.session_state.get("topcat_selected_categorical"),
-                    "top_n": st.session_state.get("topcat_top_n"),
-                    "chart_type": st.session_state.get("topcat_chart_type"),
-                    "sort_order": st.session_state.get("topcat_sort_order"),
-                }
-            else:
-                filters = {}
+            spec = _CHART_FILTER_KEYS.get(cid, {}) if isinstance(cid, str) else {}
+            filters: dict[str, Any] = {k: st.session_state.get(v) for k, v in spec.items()}
         except Exception:
             filters = {}
 
@@ -1285,3 +1479,102 @@ def _get_chart_state_tool() -> str:
         return json.dumps(payload)
     except Exception as e:
         return f'{{"error": "get_chart_state failed: {e}"}}'
+
+
+# Tool name -> handler(df, args). Lambdas look the tool functions up at call time, and
+# argument defaults mirror the schemas in _TOOL_SCHEMAS.
+_TOOL_REGISTRY: dict[str, Callable[[Any, dict[str, Any]], str]] = {
+    "df_describe": lambda df, a: _df_describe_tool(df, a.get("columns")),
+    "df_groupby_sum": lambda df, a: _df_groupby_sum_tool(
+        df, a.get("by", []), a.get("value") or "", a.get("n", 10), a.get("ascending", False)
+    ),
+    "df_top_n": lambda df, a: _df_top_n_tool(
+        df, a.get("by") or "", a.get("n", 10), a.get("ascending", False)
+    ),
+    "df_value_counts": lambda df, a: _df_value_counts_tool(
+        df, a.get("column") or "", a.get("n", 20), a.get("normalize", False)
+    ),
+    "df_unique": lambda df, a: _df_unique_tool(df, a.get("column") or "", a.get("n", 100)),
+    "df_filter_equals": lambda df, a: _df_filter_equals_tool(
+        df, a.get("column") or "", a.get("value"), a.get("limit", 50)
+    ),
+    "df_filter_in": lambda df, a: _df_filter_in_tool(
+        df, a.get("column") or "", a.get("values") or [], a.get("limit", 50)
+    ),
+    "df_filter_range": lambda df, a: _df_filter_range_tool(
+        df,
+        a.get("column") or "",
+        a.get("min_value"),
+        a.get("max_value"),
+        a.get("limit", 50),
+    ),
+    "df_pivot_table": lambda df, a: _df_pivot_table_tool(
+        df,
+        a.get("index") or [],
+        a.get("columns") or [],
+        a.get("value") or "",
+        a.get("agg", "sum"),
+        a.get("top", 20),
+    ),
+    "df_corr_top": lambda df, a: _df_corr_top_tool(df, a.get("target") or "", a.get("n", 5)),
+    "df_sql_select": lambda df, a: _df_sql_select_tool(df, a.get("sql", ""), a.get("limit", 50)),
+    "get_chart_state": lambda df, a: _get_chart_state_tool(),
+}
+
+
+@cache
+def _tool_arg_validators() -> dict[str, Any]:
+    """Compile one JSON Schema validator per tool from _TOOL_SCHEMAS (empty without jsonschema)."""
+    try:
+        import jsonschema
+    except Exception:  # pragma: no cover - optional dependency
+        return {}
+    validator_cls = jsonschema.Draft202012Validator
+    return {
+        t["function"]["name"]: validator_cls(t["function"]["parameters"]) for t in _TOOL_SCHEMAS
+    }
+
+
+def _dispatch_tool(df, name: str, args: dict[str, Any]) -> str:
+    """Run the named tool against df, or report an unknown tool or invalid arguments to the model.
+
+    Arguments are checked against the tool's declared schema first, so a malformed call gets one
+    clear message back instead of failing somewhere inside the handler.
+    """
+    handler = _TOOL_REGISTRY.get(name)
+    if handler is None:
+        return f"[unknown tool: {name}]"
+    validator = _tool_arg_validators().get(name)
+    if validator is not None:
+        error = next(iter(validator.iter_errors(args)), None)
+        if error is not None:
+            where = ".".join(map(str, error.absolute_path)) or "arguments"
+            return f"[{name} error] invalid {where}: {error.message}"
+    return handler(df, args)
+
+
+# Tools that read st.session_state need the script thread's Streamlit context, so they run
+# on the calling thread; the DataFrame tools only read df and can share a thread pool.
+_CALLER_THREAD_TOOLS = frozenset({"get_chart_state"})
+_TOOL_MAX_WORKERS = 8
+
+
+def _run_tool_calls(df, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+    """Run (name, args) tool calls and return their outputs in call order.
+
+    When the model requests several DataFrame tools in one turn they run concurrently, so the
+    tool phase takes about as long as the slowest tool instead of the sum of all of them.
+    """
+    pooled = [i for i, (name, _args) in enumerate(calls) if name not in _CALLER_THREAD_TOOLS]
+    if len(pooled) < 2:
+        return [_dispatch_tool(df, name, args) for name, args in calls]
+
+    results: list[str] = [""] * len(calls)
+    with ThreadPoolExecutor(max_workers=min(_TOOL_MAX_WORKERS, len(pooled))) as ex:
+        futures = {i: ex.submit(_dispatch_tool, df, *calls[i]) for i in pooled}
+        for i, (name, args) in enumerate(calls):
+            if i not in futures:
+                results[i] = _dispatch_tool(df, name, args)
+        for i, fut in futures.items():
+            results[i] = fut.result()
+    return results
@@ -1,5 +1,7 @@
 import os
 import sys
+import time
+from functools import cache
 from typing import Any, cast
 
 import pandas as pd
@@ -38,20 +40,12 @@ try:
     from advisor.persist import (  # type: ignore
         import_bundle_from_upload,
     )
-    from advisor.pipeline import run_interview_pipeline  # type: ignore
-    from advisor.pipeline.progress import get_progress_state, get_report  # type: ignore
     from advisor.renderer import (  # type: ignore
         # render_report_html,
         build_workbook_bundle,
         render_report_streamlit,
     )
     from advisor.schemas import InterviewInput  # type: ignore
-    from advisor.ui_progress import (  # type: ignore
-        STAGES,  # type: ignore
-        render_live_progress_tracker,
-        # render_minimal_progress,
-        # cleanup_progress_state,
-    )
 except Exception:
     from GrantScope.advisor.demo import (  # type: ignore
         get_demo_responses_dict,
@@ -60,24 +54,19 @@ except Exception:
     from GrantScope.advisor.persist import (  # type: ignore
         import_bundle_from_upload,
     )
-    from GrantScope.advisor.pipeline import run_interview_pipeline  # type: ignore
-    from GrantScope.advisor.pipeline.progress import get_progress_state, get_report  # type: ignore
     from GrantScope.advisor.renderer import (  # type: ignore
         # render_report_html,
         build_workbook_bundle,
         render_report_streamlit,
     )
     from GrantScope.advisor.schemas import InterviewInput  # type: ignore
-    from GrantScope.advisor.ui_progress import (  # type: ignore
-        STAGES,  # type: ignore
-        render_live_progress_tracker,
-        # render_minimal_progress,
-        # cleanup_progress_state,
-    )
 
 
 st.set_page_config(page_title="GrantScope — Grant Advisor Interview", page_icon=":memo:")
 
+# Seconds between reruns while a background pipeline job is running
+_POLL_INTERVAL_S = 1.5
+
 
 # --- Workbook Export helpers (Download Workbook action) ---
 
@@ -212,10 +201,13 @@ def _ensure_session_keys() -> None:
     st.session_state.setdefault("advisor_last_bundle", None)
     st.session_state.setdefault("advisor_store", {})
     st.session_state.setdefault("advisor_progress", {})
+    st.session_state.setdefault("advisor_job_id", None)
 
 
 def _comma_split(text: str) -> list[str]:
-    parts = [p.strip() for p in str(text or "").split(",")]
+    if not text:
+        return []
+    parts = [p.strip() for p in str(text).split(",")]
     return [p for p in parts if p]
 
 
@@ -225,16 +217,15 @@ def _range_parse(text: str) -> tuple[float | None, float | None]:
         return None, None
     try:
         if "," in txt:
-            lo, hi = txt.split(",", 1)
-            lo_v = float(lo.strip()) if lo.strip() else None
-            hi_v = float(hi.strip()) if hi.strip() else None
-            return lo_v, hi_v
+            lo, hi = (part.strip() for part in txt.split(",", 1))
+            return (float(lo) if lo else None), (float(hi) if hi else None)
         # Single value -> min only
         return float(txt), None
     except Exception:
         return None, None
 
 
+@st.cache_data(show_spinner=False, ttl=3600)  # Cache for 1 hour
 def _prefill_from_demo() -> dict[str, Any]:
     # Prefer JSON file override if present
     data = load_demo_responses_json() or get_demo_responses_dict()
@@ -253,21 +244,36 @@ def _make_interview_from_inputs(
     keywords_txt: str,
     notes: str,
     user_role: str,
-) -> InterviewInput:
+) -> tuple[InterviewInput, dict[str, Any]]:
+    """Parse the raw form fields once; return the interview and the form dict to persist."""
     lo, hi = _range_parse(budget_range_txt)
-    return InterviewInput(
+    form_dict: dict[str, Any] = {
+        "program_area": program_area,
+        "populations": _comma_split(populations_txt),
+        "geography": _comma_split(geography_txt),
+        "timeframe_years": int(timeframe_years) if timeframe_years is not None else None,
+        "budget_usd_range": [lo, hi],
+        "outcomes": _comma_split(outcomes_txt),
+        "constraints": _comma_split(constraints_txt),
+        "preferred_funder_types": _comma_split(funder_types_txt),
+        "keywords": _comma_split(keywords_txt),
+        "notes": notes,
+        "user_role": user_role,
+    }
+    interview = InterviewInput(
         program_area=str(program_area or ""),
-        populations=_comma_split(populations_txt),
-        geography=_comma_split(geography_txt),
-        timeframe_years=int(timeframe_years) if timeframe_years is not None else None,
+        populations=form_dict["populations"],
+        geography=form_dict["geography"],
+        timeframe_years=form_dict["timeframe_years"],
         budget_usd_range=(lo, hi) if (lo is not None or hi is not None) else None,
-        outcomes=_comma_split(outcomes_txt),
-        constraints=_comma_split(constraints_txt),
-        preferred_funder_types=_comma_split(funder_types_txt),
-        keywords=_comma_split(keywords_txt),
+        outcomes=form_dict["outcomes"],
+        constraints=form_dict["constraints"],
+        preferred_funder_types=form_dict["preferred_funder_types"],
+        keywords=form_dict["keywords"],
         notes=str(notes or ""),
         user_role=str(user_role or "Grant Analyst/Writer"),
     )
+    return interview, form_dict
 
 
 def _analysis_start_toast() -> None:
@@ -286,55 +292,78 @@ def _analysis_start_toast() -> None:
         )
 
 
-def _get_report_id(interview_data: dict[str, Any], df: pd.DataFrame) -> str:
-    """Generate a unique report ID for progress tracking."""
+@cache
+def _pipeline_runtime():
+    """Import the job runner and progress UI on first use; idle page loads skip the LLM stack."""
     try:
-        from advisor.pipeline.cache import cache_key_for  # type: ignore
-
-        try:
-            from advisor.schemas import stable_hash_for_obj  # type: ignore
-        except Exception:  # pragma: no cover
-            from GrantScope.advisor.schemas import stable_hash_for_obj  # type: ignore
-
-        key = cache_key_for(interview_data, df)
-        return f"RPT-{stable_hash_for_obj({'k': key})[:8].upper()}"
+        from advisor import ui_progress  # type: ignore
+        from advisor.pipeline import jobs, progress  # type: ignore
     except Exception:
-        # Fallback to timestamp if imports fail
-        import time
-
-        return f"RPT-{int(time.time())}"
-
-
-def _run_pipeline_with_progress(
-    interview: InterviewInput, df: pd.DataFrame, report_id: str, progress_placeholder
-) -> Any | None:
-    """Run the pipeline with real-time progress updates."""
-    try:
-        # Initialize progress state
-        progress_key = f"advisor_progress_{report_id}"
-        st.session_state[progress_key] = {"current_stage": -1, "status": "pending"}
-
-        # Show initial progress
-        with progress_placeholder:
-            render_live_progress_tracker(report_id, show_estimates=True)
-
-        # Run pipeline with progress callback
-        report = run_interview_pipeline(interview, df)
-
-        # Mark final stage as complete
-        if progress_key in st.session_state:
-            st.session_state[progress_key].update(
-                {"current_stage": len(STAGES) - 1, "status": "completed"}
-            )
+        from GrantScope.advisor import ui_progress  # type: ignore
+        from GrantScope.advisor.pipeline import jobs, progress  # type: ignore
+    return jobs, progress, ui_progress
+
+
+def _start_pipeline_job(interview: InterviewInput, df: pd.DataFrame) -> str:
+    """Submit the pipeline to the background runner and remember its report id."""
+    jobs, _, _ = _pipeline_runtime()
+    report_id = jobs.submit_pipeline_job(interview, df)
+    st.session_state["advisor_job_id"] = report_id
+    _analysis_start_toast()
+    return report_id
+
+
+def _render_job_progress(report_id: str) -> None:
+    """Render the live tracker; hand back to a full rerun once the job stops running."""
+    jobs, progress, ui_progress = _pipeline_runtime()
+    if jobs.get_job_status(report_id) != "running":
+        st.rerun()
+    with st.container():
+        ui_progress.render_live_progress_tracker(report_id, show_estimates=True)
+        # Stages publish markdown (e.g. the intake summary) before the full report exists
+        partial = progress.get_progress_state(report_id).get("partial_markdown")
+        if partial:
+            st.markdown(partial)
+
+
+# Progress ticks rerun only the tracker, not data loading, sidebar and form
+_job_progress_fragment = (
+    st.fragment(run_every=_POLL_INTERVAL_S)(_render_job_progress)
+    if hasattr(st, "fragment")
+    else None
+)
 
-        return report
 
-    except Exception as e:
-        # Mark as error
-        progress_key = f"advisor_progress_{report_id}"
-        if progress_key in st.session_state:
-            st.session_state[progress_key]["status"] = "error"
-        raise e
+def _poll_pipeline_job() -> Any | None:
+    """Render progress for the active job; return its report once it has finished."""
+    report_id = st.session_state.get("advisor_job_id")
+    if not report_id:
+        return None
+
+    jobs, progress, _ = _pipeline_runtime()
+    status = jobs.get_job_status(report_id)
+    if status == "running":
+        if _job_progress_fragment is not None:
+            _job_progress_fragment(report_id)
+            return None
+        # Streamlit without fragments: poll with throttled full-page reruns
+        _render_job_progress(report_id)
+        time.sleep(_POLL_INTERVAL_S)
+        st.rerun()
+
+    st.session_state["advisor_job_id"] = None
+    if status == "failed":
+        st.error(f"Pipeline error: {jobs.get_job_error(report_id) or 'unknown error'}")
+        jobs.forget_job(report_id)
+        return None
+
+    report = jobs.get_job_result(report_id) or progress.get_report(report_id)
+    jobs.forget_job(report_id)
+    if report is None:
+        return None
+    st.session_state["advisor_last_bundle"] = report
+    st.success("✅ Analysis complete!")
+    return report
 
 
 def render_interview_page() -> None:
@@ -346,18 +375,22 @@ def render_interview_page() -> None:
 
     st.title("Grant Advisor Interview")
 
+    # The profile cannot change mid-run; resolve it once instead of per section
+    try:
+        newbie = is_newbie(get_session_profile())
+    except Exception:
+        newbie = True
+
     # Guided help panel (Newbie Mode gated)
     try:
-        profile = get_session_profile()
-        if is_newbie(profile) and is_enabled("GS_ENABLE_NEWBIE_MODE"):
+        if newbie and is_enabled("GS_ENABLE_NEWBIE_MODE"):
             render_page_help_panel("advisor_report", audience="new")
     except Exception:
         pass
 
     # Newbie-friendly overlay
     try:
-        profile = get_session_profile()
-        if is_newbie(profile):
+        if newbie:
             with st.expander("👋 What you'll get from this interview", expanded=True):
                 st.markdown(
                     """
@@ -420,13 +453,7 @@ def render_interview_page() -> None:
     with st.form(key="advisor_interview_form", clear_on_submit=False):
         fvals: dict[str, Any] = dict(st.session_state.get("advisor_form") or {})
 
-        # For newcomers: explain each field inline
-        try:
-            profile = get_session_profile()
-            newbie = is_newbie(profile)
-        except Exception:
-            newbie = True
-
+        # For newcomers: explain each field inline (newbie resolved above)
         program_area = st.text_input(
             "Program Area",
             value=fvals.get("program_area", ""),
@@ -502,35 +529,11 @@ def render_interview_page() -> None:
         if df_nonnull is None:
             st.error("Data not available for analysis.")
         else:
-            _analysis_start_toast()
-
-            # Generate report ID for progress tracking
-            report_id = _get_report_id(form_vals, df_nonnull)
-
-            # Create placeholder for progress tracker
-            progress_placeholder = st.empty()
-
-            # Run the pipeline
-            try:
-                report = run_interview_pipeline(interview, df_nonnull)
-                st.session_state["advisor_last_bundle"] = report
-
-                # Clear progress tracker and show completion
-                progress_placeholder.empty()
-                st.success("✅ Demo analysis complete!")
-
-            except Exception as e:
-                progress_placeholder.empty()
-                st.error(f"Pipeline error: {e}")
-                return
-
-        render_report_streamlit(st.session_state["advisor_last_bundle"])
-        st.stop()
+            _start_pipeline_job(interview, df_nonnull)
 
     # Mini action plan for newbies (client-side, quick guidance)
     try:
-        profile = get_session_profile()
-        if is_newbie(profile):
+        if newbie:
             st.subheader("🗺️ Mini Action Plan")
             bullets = []
             if program_area:
@@ -550,7 +553,7 @@ def render_interview_page() -> None:
     # Normal run path
     # Background execution and live progress rendering
     if run_now and ai_enabled:
-        interview = _make_interview_from_inputs(
+        interview, form_dict = _make_interview_from_inputs(
             program_area=cast(str, program_area),
             populations_txt=populations_txt,
             geography_txt=geography_txt,
@@ -564,96 +567,24 @@ def render_interview_page() -> None:
             user_role=cast(str, user_role),
         )
         # Save raw form for persistence
-        st.session_state["advisor_form"] = {
-            "program_area": program_area,
-            "populations": _comma_split(populations_txt),
-            "geography": _comma_split(geography_txt),
-            "timeframe_years": int(timeframe_years) if timeframe_years != 0 else None,
-            "budget_usd_range": list(_range_parse(budget_range_txt)),
-            "outcomes": _comma_split(outcomes_txt),
-            "constraints": _comma_split(constraints_txt),
-            "preferred_funder_types": _comma_split(funder_types_txt),
-            "keywords": _comma_split(keywords_txt),
-            "notes": notes,
-            "user_role": user_role,
-        }
+        st.session_state["advisor_form"] = form_dict
 
         df_nonnull2 = cast(pd.DataFrame, df) if df is not None else None
 
         if df_nonnull2 is None:
             st.error("Data not available for analysis.")
         else:
-            import threading
-            import time
-
-            # Generate report ID for progress tracking
-            report_id = _get_report_id(st.session_state.get("advisor_form", {}), df_nonnull2)
-            st.session_state["advisor_current_report_id"] = report_id
-
-            _analysis_start_toast()
-
-            # Background thread to run pipeline (no Streamlit calls inside)
-            def _run_pipeline_bg():
-                try:
-                    # Invoke pipeline; progress updates occur via internal callbacks/store
-                    rpt = run_interview_pipeline(interview, df_nonnull2)
-                    # Persist result into the store for retrieval on UI thread
-                    from advisor.pipeline.progress import _LOCK, _REPORT_STORE  # type: ignore
-
-                    with _LOCK:
-                        _REPORT_STORE[report_id] = rpt
-                except Exception as e:
-                    from advisor.pipeline.progress import _LOCK, _PROGRESS_STATE  # type: ignore
-
-                    with _LOCK:
-                        st_err = str(e)
-                        state = _PROGRESS_STATE.setdefault(report_id, {})
-                        state.update({"status": "error", "message": st_err})
-
-            if not st.session_state.get("advisor_run_in_progress"):
-                st.session_state["advisor_run_in_progress"] = True
-                t = threading.Thread(target=_run_pipeline_bg, daemon=True)
-                t.start()
-
-            # Create placeholder for progress tracker
-            report = None
-            progress_placeholder = st.empty()
-
-            # Show live progress tracker and auto-refresh until completion
-            with progress_placeholder:
-                render_live_progress_tracker(report_id, show_estimates=True)
-
-            state = get_progress_state(report_id)
-            if st.session_state.get("advisor_run_in_progress") and state.get("status") not in {
-                "completed",
-                "error",
-            }:
-                last = st.session_state.get("advisor_last_refresh_ts", 0.0)
-                now = time.time()
-                # Throttle reruns to ~1.5s
-                if now - float(last) > 1.5:
-                    st.session_state["advisor_last_refresh_ts"] = now
-                    # Trigger a rerun to update progress display
-                    st.rerun()
-            else:
-                # Clear progress placeholder and show completion or error
-                progress_placeholder.empty()
-                # mark not in progress
-                st.session_state["advisor_run_in_progress"] = False
-                if state.get("status") == "error":
-                    err_msg = state.get("message") or "Pipeline error"
-                    st.error(f"Pipeline error: {err_msg}")
-                    report = None
-                else:
-                    st.success("✅ Analysis complete!")
-                    # Retrieve report from store if available, fallback to session
-                    report = get_report(report_id) or st.session_state.get("advisor_last_bundle")
-            render_report_streamlit(report)
-            try:
-                _render_workbook_download(report)
-            except Exception:
-                pass
-            st.success("Analysis complete. See tabs above for details and downloads.")
+            _start_pipeline_job(interview, df_nonnull2)
+
+    # Poll the background job on every rerun until its report is ready
+    report = _poll_pipeline_job()
+    if report is not None:
+        render_report_streamlit(report)
+        try:
+            _render_workbook_download(report)
+        except Exception:
+            pass
+        st.success("Analysis complete. See tabs above for details and downloads.")
 
     # Restore from JSON
     st.subheader("Restore Report From JSON")
@@ -676,8 +607,8 @@ def render_interview_page() -> None:
     # Show last bundle if available (helps persistence when navigating back)
     if (
         st.session_state.get("advisor_last_bundle")
-        and not run_now
-        and not st.session_state.get("advisor_demo_autorun")
+        and report is None
+        and not st.session_state.get("advisor_job_id")
     ):
         st.markdown("### Last Report")
         render_report_streamlit(st.session_state["advisor_last_bundle"])
@@ -556,3 +556,174 @@ def test_fallback_ignores_nullish_funders(monkeypatch):
     assert all(
         isinstance(c.rationale, str) and c.rationale for c in cands if c.name in {"A", "B", "C"}
     )
+
+
+def test_pipeline_job_runs_in_background_and_dedupes(monkeypatch):
+    import threading
+
+    try:
+        from GrantScope.advisor.pipeline import jobs  # type: ignore
+    except Exception:  # pragma: no cover
+        from advisor.pipeline import jobs  # type: ignore
+
+    df = _tiny_df()
+    interview = InterviewInput(program_area="Education", populations=["youth"])
+    release = threading.Event()
+    calls = []
+
+    def _fake_pipeline(iv, frame):
+        calls.append(iv)
+        release.wait(5)
+        return "bundle"
+
+    monkeypatch.setattr(ap, "run_interview_pipeline", _fake_pipeline)
+
+    report_id = jobs.submit_pipeline_job(interview, df)
+    assert report_id == ap.cache.report_id_for(interview, df)
+    assert jobs.submit_pipeline_job(interview, df) == report_id
+    assert jobs.get_job_status(report_id) == "running"
+    assert jobs.get_job_result(report_id) is None
+
+    release.set()
+    jobs._JOBS[report_id].result(timeout=5)
+    assert jobs.get_job_status(report_id) == "finished"
+    assert jobs.get_job_result(report_id) == "bundle"
+    assert len(calls) == 1
+
+    jobs.forget_job(report_id)
+    assert jobs.get_job_status(report_id) == "missing"
+
+
+def test_pipeline_job_failure_is_reported(monkeypatch):
+    try:
+        from GrantScope.advisor.pipeline import jobs, progress  # type: ignore
+    except Exception:  # pragma: no cover
+        from advisor.pipeline import jobs, progress  # type: ignore
+
+    def _boom(iv, frame):
+        raise RuntimeError("llm down")
+
+    monkeypatch.setattr(ap, "run_interview_pipeline", _boom)
+    interview = InterviewInput(program_area="Failing job")
+    report_id = jobs.submit_pipeline_job(interview, _tiny_df())
+    with pytest.raises(RuntimeError):
+        jobs._JOBS[report_id].result(timeout=5)
+
+    assert jobs.get_job_status(report_id) == "failed"
+    assert jobs.get_job_error(report_id) == "llm down"
+    assert progress.get_progress_state(report_id)["status"] == "error"
+    jobs.forget_job(report_id)
+    progress.cleanup_progress_data(report_id)
+
+
+def test_pipeline_iter_yields_stage_events(monkeypatch):
+    df = _tiny_df()
+    interview = InterviewInput(program_area="Streaming stages")
+    monkeypatch.setattr(ap, "_stage0_intake_summary_cached", lambda key, d: "Intake ready.")
+    monkeypatch.setattr(
+        ap,
+        "_stage1_normalize_cached",
+        lambda key, d: {"subjects": [], "populations": [], "geographies": [], "weights": {}},
+    )
+    monkeypatch.setattr(ap, "_stage2_plan_cached", lambda key, d: {"metric_requests": []})
+    monkeypatch.setattr(ap, "_stage4_synthesize_cached", lambda key, plan, dps: [])
+    monkeypatch.setattr(ap, "_stage5_recommend_cached", lambda key, needs, dps: {})
+
+    events = list(ap.run_interview_pipeline_iter(interview, df))
+    assert [e.stage for e in events] == [0, 1, 2, 3, 5, 6]
+    assert events[0].partial_markdown == "Intake ready."
+    assert [e.pct for e in events] == sorted(e.pct for e in events)
+    assert events[-1].pct == 1.0
+    assert isinstance(events[-1].report, ReportBundle)
+    assert all(e.report is None for e in events[:-1])
+
+    report_id = ap.cache.report_id_for(interview, df)
+    assert ap.progress.get_progress_state(report_id)["partial_markdown"] == "Intake ready."
+    ap.progress.cleanup_progress_data(report_id)
+
+
+def test_data_fingerprint_distinguishes_same_signature():
+    df1 = _tiny_df()
+    df2 = df1.copy()
+    df2.loc[0, "funder_name"] = "C"
+    assert ap.compute_data_signature(df1) == ap.compute_data_signature(df2)
+    assert ap.compute_data_fingerprint(df1) != ap.compute_data_fingerprint(df2)
+    assert ap.compute_data_fingerprint(df1) == ap.compute_data_fingerprint(_tiny_df())
+
+
+def test_memoized_pipeline_reuses_identical_runs(monkeypatch):
+    calls = []
+
+    def _fake_pipeline(iv, frame):
+        calls.append(iv)
+        return f"bundle-{len(calls)}"
+
+    monkeypatch.setattr(ap, "run_interview_pipeline", _fake_pipeline)
+    monkeypatch.setattr(ap.cache, "_RESULT_CACHE", type(ap.cache._RESULT_CACHE)())
+    interview = InterviewInput(program_area="Memoized")
+
+    assert ap.memoized_pipeline(interview, _tiny_df()) == "bundle-1"
+    assert ap.memoized_pipeline(InterviewInput(program_area="Memoized"), _tiny_df()) == "bundle-1"
+    assert ap.memoized_pipeline(InterviewInput(program_area="Other"), _tiny_df()) == "bundle-2"
+    assert len(calls) == 2
+
+
+def test_progress_stores_keep_only_recent_reports(monkeypatch):
+    try:
+        from GrantScope.advisor.pipeline import progress  # type: ignore
+    except Exception:  # pragma: no cover
+        from advisor.pipeline import progress  # type: ignore
+
+    monkeypatch.setattr(progress, "_PROGRESS_STATE", {})
+    monkeypatch.setattr(progress, "_PROGRESS_LOGS", {})
+    monkeypatch.setattr(progress, "_REPORT_STORE", {})
+    monkeypatch.setattr(progress, "_MAX_TRACKED_REPORTS", 2)
+
+    for rid in ("RPT-A", "RPT-B"):
+        progress._push_progress(rid, "Stage 0: Summarizing intake")
+        progress._persist_report(rid, rid.lower())
+    # Restarting A makes it the newest, so adding C evicts B
+    progress.create_progress_callback("RPT-A")
+    progress._push_progress("RPT-C", "Stage 0: Summarizing intake")
+    progress._persist_report("RPT-C", "rpt-c")
+
+    assert list(progress._PROGRESS_STATE) == ["RPT-A", "RPT-C"]
+    assert list(progress._PROGRESS_LOGS) == ["RPT-A", "RPT-C"]
+    assert progress.get_report("RPT-B") is None
+    assert progress.get_report("RPT-C") == "rpt-c"
+
+
+def test_independent_llm_calls_overlap(monkeypatch):
+    import threading
+
+    # Each pair of calls only gets past the barrier if both run at the same time
+    stage_barrier = threading.Barrier(2, timeout=5)
+    tool_barrier = threading.Barrier(2, timeout=5)
+
+    def _intake(key, d):
+        stage_barrier.wait()
+        return "Intake."
+
+    def _normalize(key, d):
+        stage_barrier.wait()
+        return {"subjects": [], "populations": [], "geographies": [], "weights": {}}
+
+    def _tool(_df, q, _pre, _extra=None):
+        tool_barrier.wait()
+        return "| col | value |\n| --- | --- |\n| demo | 1 |"
+
+    plan = {
+        "metric_requests": [
+            {"tool": "df_value_counts", "params": {"column": "funder_name"}, "title": "A"},
+            {"tool": "df_value_counts", "params": {"column": "recip_name"}, "title": "B"},
+        ]
+    }
+    monkeypatch.setattr(ap, "_stage0_intake_summary_cached", _intake)
+    monkeypatch.setattr(ap, "_stage1_normalize_cached", _normalize)
+    monkeypatch.setattr(ap, "_stage2_plan_cached", lambda key, d: plan)
+    monkeypatch.setattr(ap, "tool_query", _tool)
+    monkeypatch.setattr(ap, "_stage4_synthesize_cached", lambda key, plan, dps: [])
+    monkeypatch.setattr(ap, "_stage5_recommend_cached", lambda key, needs, dps: {})
+
+    report = ap.run_interview_pipeline(InterviewInput(program_area="Overlap"), _tiny_df())
+    assert [dp.title for dp in report.datapoints[:2]] == ["A", "B"]
@@ -127,3 +127,52 @@ def test_profile_functions_logic():
     assert restored.experience_level == profile.experience_level
     assert restored.org_type == profile.org_type
     assert restored.primary_goal == profile.primary_goal
+
+
+def test_set_session_profile_bumps_profile_version():
+    """Replacing the profile changes the version used by profile-derived caches."""
+    from utils.app_state import get_session_profile_version, set_session_profile
+
+    before = get_session_profile_version()
+    profile = UserProfile(
+        user_id="test123",
+        experience_level="new",
+        org_type="nonprofit",
+        primary_goal="Fund programs",
+        region="California",
+        newsletter_opt_in=False,
+        completed_onboarding=True,
+        created_at=datetime.now(),
+    )
+    set_session_profile(profile)
+    assert get_session_profile_version() == before + 1
+
+
+def test_get_data_reuses_frames_within_session(monkeypatch):
+    from types import SimpleNamespace
+
+    import utils.app_state as app_state
+
+    calls = []
+
+    def _fake_load(file_path, file_bytes):
+        calls.append((file_path, file_bytes))
+        return object(), object()
+
+    monkeypatch.setattr(app_state.st, "session_state", {})
+    monkeypatch.setattr(app_state, "_load_and_preprocess", _fake_load)
+
+    first = app_state.get_data(None)
+    assert app_state.get_data(None) == first
+    assert len(calls) == 1
+
+    upload = SimpleNamespace(file_id="abc")
+    df, _, err = app_state.get_data(upload)
+    assert err is None and df is not first[0]
+    assert app_state.get_data(upload)[0] is df
+    assert len(calls) == 2
+
+    # Uploads without a stable id are never memoized
+    app_state.get_data(SimpleNamespace())
+    app_state.get_data(SimpleNamespace())
+    assert len(calls) == 4
@@ -0,0 +1,179 @@
+import pytest
+
+from fetch import fetch
+
+
+@pytest.fixture(autouse=True)
+def reset_key_cache():
+    fetch.reset_candid_key_cache()
+    yield
+    fetch.reset_candid_key_cache()
+
+
+def test_candid_key_resolved_once(monkeypatch):
+    calls = []
+
+    class _Cfg:
+        @staticmethod
+        def get_candid_key():
+            calls.append(1)
+            return "cfg-key"
+
+    monkeypatch.setattr(fetch, "config", _Cfg)
+    assert fetch._resolve_candid_key() == "cfg-key"
+    assert fetch._resolve_candid_key() == "cfg-key"
+    assert len(calls) == 1
+
+    fetch.reset_candid_key_cache()
+    assert fetch._resolve_candid_key() == "cfg-key"
+    assert len(calls) == 2
+
+
+def test_candid_key_env_fallback_not_cached_when_missing(monkeypatch):
+    monkeypatch.setattr(fetch, "config", None)
+    monkeypatch.delenv("CANDID_API_KEY", raising=False)
+    assert fetch._resolve_candid_key() is None
+
+    monkeypatch.setenv("CANDID_API_KEY", "env-key")
+    assert fetch._resolve_candid_key() == "env-key"
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_roundtrip_with_and_without_orjson(monkeypatch, tmp_path, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fetch, "orjson", None)
+
+    payload = {"grants": [{"grant_key": "g1", "amount_usd": 1000}]}
+    out = tmp_path / "grants.json"
+    fetch._write_json(str(out), payload)
+
+    assert fetch._parse_json(out.read_bytes()) == payload
+
+
+class _FakeResponse:
+    def __init__(self, status_code, payload=b"{}"):
+        self.status_code = status_code
+        self.content = payload
+        self.text = payload.decode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise fetch.requests.exceptions.HTTPError(f"{self.status_code} error")
+
+
+class _FakeSession(fetch.requests.Session):
+    def __init__(self, responses):
+        super().__init__()
+        self._responses = list(responses)
+        self.sent = []
+        self.send_kwargs = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        self.send_kwargs.append(kwargs)
+        return self._responses.pop(0)
+
+
+def _fetch_page(**kwargs):
+    return fetch.get_grants_transactions(
+        1, (2020, 2021), (0, 1000), ["SJ02"], ["PA010000"], ["4671654"], ["TA"], **kwargs
+    )
+
+
+def test_retry_resends_same_prepared_request(monkeypatch):
+    monkeypatch.setenv("CANDID_API_KEY", "k")
+    monkeypatch.setattr(fetch, "config", None)
+    monkeypatch.setattr(fetch.time, "sleep", lambda _s: None)
+    session = _FakeSession([_FakeResponse(429), _FakeResponse(200, b'{"grants": []}')])
+    monkeypatch.setattr(fetch, "_SESSION", session)
+
+    assert _fetch_page() == {"grants": []}
+    assert len(session.sent) == 2
+    assert session.sent[0] is session.sent[1]
+    assert session.sent[0].headers["Subscription-Key"] == "k"
+
+
+def test_client_error_fails_fast_without_retry(monkeypatch):
+    monkeypatch.setenv("CANDID_API_KEY", "k")
+    monkeypatch.setattr(fetch, "config", None)
+    sleeps = []
+    monkeypatch.setattr(fetch.time, "sleep", sleeps.append)
+    session = _FakeSession([_FakeResponse(400, b"bad subject")])
+    monkeypatch.setattr(fetch, "_SESSION", session)
+
+    with pytest.raises(RuntimeError, match="Client error 400"):
+        _fetch_page()
+    assert len(session.sent) == 1
+    assert sleeps == []
+
+
+def test_server_error_is_retried(monkeypatch):
+    monkeypatch.setenv("CANDID_API_KEY", "k")
+    monkeypatch.setattr(fetch, "config", None)
+    monkeypatch.setattr(fetch.time, "sleep", lambda _s: None)
+    session = _FakeSession([_FakeResponse(503), _FakeResponse(200, b'{"grants": [1]}')])
+    monkeypatch.setattr(fetch, "_SESSION", session)
+
+    assert _fetch_page() == {"grants": [1]}
+    assert len(session.sent) == 2
+
+
+def test_get_unique_file_name_skips_existing(tmp_path):
+    target = tmp_path / "grants_data.json"
+    assert fetch.get_unique_file_name(str(target)) == str(target)
+
+    target.write_text("{}")
+    (tmp_path / "grants_data_1.json").write_text("{}")
+    assert fetch.get_unique_file_name(str(target)) == str(tmp_path / "grants_data_2.json")
+
+
+def test_prebuilt_query_suffix_matches_inline_url(monkeypatch):
+    monkeypatch.setenv("CANDID_API_KEY", "k")
+    monkeypatch.setattr(fetch, "config", None)
+    session = _FakeSession([_FakeResponse(200), _FakeResponse(200)])
+    monkeypatch.setattr(fetch, "_SESSION", session)
+
+    suffix = fetch.build_query_suffix(
+        (2020, 2021), (0, 1000), ["SJ02"], ["PA010000"], ["4671654"], ["TA"]
+    )
+    _fetch_page()
+    _fetch_page(query_suffix=suffix)
+
+    assert session.sent[0].url == session.sent[1].url
+    assert "page=1&location=4671654" in session.sent[0].url
+    assert "year=2020,2021" in session.sent[0].url
+
+
+def test_split_csv_trims_whitespace_and_empties():
+    assert fetch.split_csv(" SJ02, SJ05 ,,SJ07 ") == ["SJ02", "SJ05", "SJ07"]
+    assert fetch.split_csv("") == []
+
+
+def test_validate_input_int_bounds():
+    assert fetch.validate_input(" 2020 ", int, min_value=1900, max_value=2100) == 2020
+    with pytest.raises(ValueError, match="Invalid input: Value should be greater"):
+        fetch.validate_input("1800", int, min_value=1900)
+    with pytest.raises(ValueError, match="Invalid input"):
+        fetch.validate_input("20x0", int)
+
+
+def test_request_carries_session_defaults_and_env_settings(monkeypatch, tmp_path):
+    monkeypatch.setenv("CANDID_API_KEY", "k")
+    monkeypatch.setattr(fetch, "config", None)
+    bundle = tmp_path / "ca.pem"
+    bundle.write_text("")
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", str(bundle))
+    session = _FakeSession([_FakeResponse(200)])
+    monkeypatch.setattr(fetch, "_SESSION", session)
+
+    _fetch_page()
+
+    defaults = fetch.requests.utils.default_headers()
+    sent = session.sent[0]
+    assert sent.headers["Accept-Encoding"] == defaults["Accept-Encoding"]
+    assert sent.headers["User-Agent"] == defaults["User-Agent"]
+    assert sent.headers["accept"] == "application/json"
+    assert session.send_kwargs[0]["verify"] == str(bundle)
+    assert session.send_kwargs[0]["timeout"] is not None
@@ -0,0 +1,518 @@
+import subprocess
+import sys
+
+
+def test_module_import_does_not_load_llm_sdks():
+    code = (
+        "import sys; import loaders.llama_index_setup; "
+        "print('openai' in sys.modules, 'llama_index.core' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd="."
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False False"
+
+
+def test_dummy_client_supports_plain_and_streaming_calls():
+    from loaders import llama_index_setup as lis
+
+    completions = lis._DUMMY_CLIENT.chat.completions
+    assert completions.create(messages=[]).choices[0].message.content == "OK"
+    assert list(completions.create(messages=[], stream=True)) == []
+
+
+def test_prompt_orders_stable_context_before_user_specific_parts(monkeypatch):
+    from types import SimpleNamespace
+
+    from loaders import llama_index_setup as lis
+
+    class _Completions:
+        def create(self, **kwargs):
+            client.last_kwargs = kwargs
+            return lis._DummyResp("OK")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()), last_kwargs=None)
+    monkeypatch.setattr(lis, "get_openai_client", lambda: client)
+    monkeypatch.setattr(lis, "_build_user_context_wedge", lambda: "User Context: region=WA.")
+    monkeypatch.setattr(lis, "_build_planner_budget_wedge", lambda: None)
+    monkeypatch.setattr(lis, "_summarize_df", lambda _df: "Known Columns: amount_usd")
+
+    lis.tool_query(object(), "Top funders?", pre_prompt="Pre", extra_ctx="Chart")
+
+    system_msg, user_msg = client.last_kwargs["messages"]
+    assert system_msg is lis._SYSTEM_MESSAGE_TOOL_ANALYST
+    content = user_msg["content"]
+    assert content.index("Known Columns") < content.index("Pre") < content.index("User Context")
+    assert content.endswith("Top funders?")
+
+
+def test_summarize_df_reuses_summary_until_frame_changes(monkeypatch):
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    calls = []
+    compute = lis._compute_df_summary
+    monkeypatch.setattr(lis, "_compute_df_summary", lambda df: calls.append(1) or compute(df))
+    monkeypatch.setattr(lis, "_DF_SUMMARY_CACHE", {})
+
+    df = pd.DataFrame({"amount_usd": [100.0, 250.0], "funder_name": ["A", "B"]})
+    first = lis._summarize_df(df)
+    assert lis._summarize_df(df) == first
+    assert "sum=350.00" in first
+    assert len(calls) == 1
+
+    df["year_issued"] = [2020, 2021]
+    assert "year_issued" in lis._summarize_df(df)
+    assert len(calls) == 2
+
+
+def test_groupby_sum_tool_returns_top_groups_in_order():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame(
+        {
+            "funder_name": pd.Categorical(["A", "B", "A", "C"], categories=["A", "B", "C", "Z"]),
+            "amount_usd": [10.0, 50.0, 30.0, 5.0],
+        }
+    )
+    top = lis._df_groupby_sum_tool(df, ["funder_name"], "amount_usd", n=2)
+    assert top.index("B") < top.index("A")
+    assert "C" not in top and "Z" not in top
+
+    bottom = lis._df_groupby_sum_tool(df, ["funder_name"], "amount_usd", n=1, ascending=True)
+    assert "C" in bottom and "Z" not in bottom
+
+
+def test_safe_markdown_table_renders_pipe_table_without_tabulate():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame(
+        {"funder_name": ["B", "A|x"], "amount_usd": [1_250_000.0, float("nan")], "n": [1, 2]}
+    )
+    assert lis._safe_markdown_table(df).splitlines() == [
+        "| funder_name | amount_usd | n |",
+        "| --- | --- | --- |",
+        "| B | 1250000 | 1 |",
+        "| A\\|x |  | 2 |",
+    ]
+
+
+def test_known_columns_text_tracks_column_changes(monkeypatch):
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    monkeypatch.setattr(lis, "_KNOWN_COLS_CACHE", {})
+    df = pd.DataFrame({"funder_name": ["A"], "amount_usd": [1.0]})
+    assert lis._known_columns_text(df) == "funder_name, amount_usd"
+    assert len(lis._KNOWN_COLS_CACHE) == 1
+
+    df["year_issued"] = [2020]
+    assert lis._known_columns_text(df) == "funder_name, amount_usd, year_issued"
+    assert lis._known_columns_text(object()) == ""
+
+
+def test_stream_query_coalesces_deltas_and_escapes_dollars(monkeypatch):
+    from types import SimpleNamespace
+
+    from loaders import llama_index_setup as lis
+
+    deltas = ["Total ", "is ", "$5", "0", None, " across " + "x" * 40, " grants."]
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))]) for d in deltas
+    ]
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **_kw: iter(chunks)))
+    )
+    monkeypatch.setattr(lis, "get_openai_client", lambda: client)
+    monkeypatch.setattr(lis, "setup_llama_index", lambda: None)
+
+    out = list(lis.stream_query(None, "q", ""))
+    assert len(out) == 2
+    assert "".join(out) == "Total is \\$50 across " + "x" * 40 + " grants."
+
+
+def test_top_n_tool_selects_numeric_and_sorts_text_columns():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame({"funder_name": ["B", "A", "C"], "amount_usd": [10.0, 50.0, 30.0]})
+    top = lis._df_top_n_tool(df, "amount_usd", n=2)
+    assert top.index("| A | 50 |") < top.index("| C | 30 |")
+    assert "| B |" not in top
+
+    first = lis._df_top_n_tool(df, "funder_name", n=1, ascending=True)
+    assert "| A | 50 |" in first and "| B |" not in first
+
+
+def test_disable_pandas_query_engine_patches_only_loaded_module(monkeypatch):
+    import types
+
+    import pytest
+
+    from loaders import llama_index_setup as lis
+
+    name = "llama_index.experimental.query_engine"
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    lis._disable_pandas_query_engine()
+    assert name not in sys.modules
+
+    fake = types.ModuleType(name)
+    fake.PandasQueryEngine = object
+    monkeypatch.setitem(sys.modules, name, fake)
+    lis._disable_pandas_query_engine()
+    with pytest.raises(RuntimeError, match="disabled"):
+        fake.PandasQueryEngine()
+
+
+def test_user_context_wedge_reused_until_profile_version_changes(monkeypatch):
+    import types
+
+    import streamlit as st
+
+    from loaders import llama_index_setup as lis
+
+    calls = []
+    state = {"version": 1}
+    profile = types.SimpleNamespace(org_type="nonprofit", region="WA", primary_goal="")
+    fake = types.ModuleType("utils.app_state")
+    fake.get_session_profile = lambda: calls.append(1) or profile
+    fake.get_session_profile_version = lambda: state["version"]
+    monkeypatch.setitem(sys.modules, "utils.app_state", fake)
+    monkeypatch.setattr(st, "session_state", {}, raising=False)
+
+    first = lis._build_user_context_wedge()
+    assert first == "User Context: org_type=nonprofit, region=WA."
+    assert lis._build_user_context_wedge() == first
+    assert len(calls) == 1
+
+    profile.region = "OR"
+    state["version"] = 2
+    assert "region=OR" in lis._build_user_context_wedge()
+    assert len(calls) == 2
+
+
+def test_resolve_chart_context_accepts_clean_and_padded_ids():
+    from loaders import llama_index_setup as lis
+
+    chart_id = next(iter(lis._CHART_CONTEXT_MAP))
+    assert lis.resolve_chart_context(chart_id) == lis._CHART_CONTEXT_MAP[chart_id]
+    assert lis.resolve_chart_context(f"  {chart_id}\n") == lis._CHART_CONTEXT_MAP[chart_id]
+    assert lis.resolve_chart_context("unknown.chart") is None
+    assert lis.resolve_chart_context(None) is None
+
+
+def test_tool_query_passes_shared_tool_schemas(monkeypatch):
+    from types import SimpleNamespace
+
+    from loaders import llama_index_setup as lis
+
+    seen = []
+
+    def _create(**kwargs):
+        seen.append(kwargs["tools"])
+        return lis._DummyResp("OK")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    monkeypatch.setattr(lis, "get_openai_client", lambda: client)
+    monkeypatch.setattr(lis, "_summarize_df", lambda _df: "")
+
+    lis.tool_query(object(), "a", pre_prompt="")
+    lis.tool_query(object(), "b", pre_prompt="")
+    assert seen[0] is lis._TOOL_SCHEMAS and seen[1] is lis._TOOL_SCHEMAS
+
+
+def test_tool_registry_covers_every_schema():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    schema_names = {t["function"]["name"] for t in lis._TOOL_SCHEMAS}
+    assert set(lis._TOOL_REGISTRY) == schema_names
+
+    df = pd.DataFrame({"funder_name": ["A", "B"], "amount_usd": [1.0, 2.0]})
+    assert "| B | 2 |" in lis._dispatch_tool(df, "df_top_n", {"by": "amount_usd", "n": 1})
+    assert lis._dispatch_tool(df, "df_drop", {}) == "[unknown tool: df_drop]"
+
+
+def test_run_tool_calls_overlaps_dataframe_tools_and_keeps_order(monkeypatch):
+    import threading
+
+    from loaders import llama_index_setup as lis
+
+    barrier = threading.Barrier(2, timeout=5)
+    caller = threading.get_ident()
+
+    def _slow(_df, a):
+        barrier.wait()  # only returns if both tools run at the same time
+        return a.get("by") or a["columns"][0]
+
+    registry = {
+        "df_describe": _slow,
+        "df_top_n": _slow,
+        "get_chart_state": lambda _df, _a: str(threading.get_ident() == caller),
+    }
+    monkeypatch.setattr(lis, "_TOOL_REGISTRY", registry)
+
+    calls = [
+        ("df_top_n", {"by": "top"}),
+        ("get_chart_state", {}),
+        ("df_describe", {"columns": ["d"]}),
+    ]
+    assert lis._run_tool_calls(None, calls) == ["top", "True", "d"]
+
+
+def test_numeric_view_reused_across_describe_and_corr(monkeypatch):
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    monkeypatch.setattr(lis, "_NUMERIC_VIEW_CACHE", {})
+    df = pd.DataFrame({"funder_name": ["A", "B", "C"], "amount_usd": [1.0, 2.0, 4.0]})
+    df["year_issued"] = [2020, 2021, 2022]
+
+    view = lis._numeric_view(df)
+    assert list(view.columns) == ["amount_usd", "year_issued"]
+    assert "amount_usd" in lis._df_describe_tool(df)
+    assert "year_issued" in lis._df_corr_top_tool(df, "amount_usd")
+    assert lis._numeric_view(df) is view
+
+    df["n"] = [1, 1, 2]
+    assert "n" in lis._numeric_view(df).columns
+
+
+def test_sql_select_tool_blocks_keywords_on_any_whitespace():
+    from loaders import llama_index_setup as lis
+
+    blocked = "[df_sql_select error] disallowed keyword detected"
+    assert lis._df_sql_select_tool(None, "SELECT * FROM t\nWHERE 1=1\tDROP\nTABLE t") == blocked
+    assert lis._df_sql_select_tool(None, "WITH x AS (SELECT 1) SELECT * FROM (DELETE)") == blocked
+    assert lis._df_sql_select_tool(None, "SELECT REPLACE INTO t") == blocked
+    assert not lis._SQL_FORBIDDEN.search(
+        "select replace(funder_name, 'a', 'b'), grant_update_at from t"
+    )
+
+
+def test_sql_select_tool_reuses_connection_per_frame(monkeypatch):
+    import pandas as pd
+    import pytest
+
+    from loaders import llama_index_setup as lis
+
+    duckdb = pytest.importorskip("duckdb")
+    monkeypatch.setattr(lis, "_DUCKDB_CONN_CACHE", {})
+    connects = []
+    real_connect = duckdb.connect
+    monkeypatch.setattr(duckdb, "connect", lambda *a, **k: connects.append(1) or real_connect())
+
+    df = pd.DataFrame({"funder_name": ["A", "B"], "amount_usd": [1.0, 2.0]})
+    assert "| 3 |" in lis._df_sql_select_tool(df, "SELECT SUM(amount_usd) AS total FROM t")
+    df["n"] = [5, 6]
+    assert "| 11 |" in lis._df_sql_select_tool(df, "SELECT SUM(n) AS total FROM t")
+    assert len(connects) == 1
+
+
+def test_tool_query_reuses_tool_plan_for_repeated_question(monkeypatch):
+    from types import SimpleNamespace
+
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    call = SimpleNamespace(
+        id="call_1",
+        function=SimpleNamespace(name="df_top_n", arguments='{"by": "amount_usd", "n": 1}'),
+    )
+    requests = []
+
+    def _create(**kwargs):
+        requests.append(kwargs)
+        if "tools" in kwargs:
+            msg = SimpleNamespace(content="", tool_calls=[call])
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+        return lis._DummyResp("Top funder is B")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    monkeypatch.setattr(lis, "get_openai_client", lambda: client)
+    monkeypatch.setattr(lis, "_TOOL_PLAN_CACHE", {})
+
+    df = pd.DataFrame({"funder_name": ["A", "B"], "amount_usd": [1.0, 2.0]})
+    assert lis.tool_query(df, "Top funder?", pre_prompt="") == "Top funder is B"
+    assert lis.tool_query(df, "Top funder?", pre_prompt="") == "Top funder is B"
+    assert ["tools" in r for r in requests] == [True, False, False]
+    tool_msg = requests[-1]["messages"][-1]
+    assert tool_msg["tool_call_id"] == "call_1" and "| B | 2 |" in tool_msg["content"]
+
+    lis.tool_query(df.copy(), "Top funder?", pre_prompt="")
+    assert "tools" in requests[-2]
+
+
+def test_value_counts_tool_returns_most_frequent_first():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame({"funder_name": ["A", "B", "B", None, "C", "C", "C"]})
+    out = lis._df_value_counts_tool(df, "funder_name", n=2).splitlines()
+    assert out[2:] == ["| C | 3 |", "| B | 2 |"]
+
+
+def test_unique_tool_keeps_first_seen_order_and_limit():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame({"year_issued": [2021, None, 2020, 2021, 2019]})
+    out = lis._df_unique_tool(df, "year_issued", n=2).splitlines()
+    assert out[2:] == ["| 2021.0 |", "| 2020.0 |"]
+
+    cats = pd.DataFrame(
+        {"region": pd.Categorical(["WA", "OR", "WA"], categories=["OR", "WA", "ID"])}
+    )
+    assert lis._df_unique_tool(cats, "region").splitlines()[2:] == ["| WA |", "| OR |"]
+
+
+def test_filter_range_tool_bounds_and_limit():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame({"grant_key": list("abcde"), "amount_usd": [5.0, None, 10.0, 20.0, 30.0]})
+    rows = lis._df_filter_range_tool(df, "amount_usd", 10, 30, limit=2).splitlines()[2:]
+    assert rows == ["| c | 10 |", "| d | 20 |"]
+    assert len(lis._df_filter_range_tool(df, "amount_usd").splitlines()) == 2 + 4
+    assert "not comparable" in lis._df_filter_range_tool(df, "amount_usd", "lots")
+
+
+def test_corr_top_tool_computes_matrix_once_per_frame(monkeypatch):
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    monkeypatch.setattr(lis, "_NUMERIC_CORR_CACHE", {})
+    df = pd.DataFrame(
+        {"amount_usd": [1.0, 2.0, 4.0, 8.0], "year_issued": [1, 2, 3, 4], "n": [4, 1, 3, 2]}
+    )
+    first = lis._df_corr_top_tool(df, "amount_usd", n=1)
+    matrix = lis._numeric_corr(df)
+    assert "year_issued" in first and "| n |" not in first
+    assert "amount_usd" in lis._df_corr_top_tool(df, "year_issued", n=1)
+    assert lis._numeric_corr(df) is matrix
+
+
+def test_chart_state_tool_reports_filters_for_selected_chart(monkeypatch):
+    import json
+    import types
+
+    import streamlit as st
+
+    from loaders import llama_index_setup as lis
+
+    fake = types.ModuleType("utils.app_state")
+    fake.get_selected_chart = lambda default=None: "treemaps.main"
+    monkeypatch.setitem(sys.modules, "utils.app_state", fake)
+    monkeypatch.setattr(
+        st, "session_state", {"treemap_analyze_column": "funder_name", "x": 1}, raising=False
+    )
+
+    payload = json.loads(lis._get_chart_state_tool())
+    assert payload["chart_id"] == "treemaps.main"
+    assert payload["filters"] == {"analyze_column": "funder_name", "selected_label": None}
+
+    fake.get_selected_chart = lambda default=None: "relationships.description_vs_amount"
+    assert json.loads(lis._get_chart_state_tool())["filters"] == {}
+
+
+def test_grouping_frame_categorizes_repeated_strings_without_touching_df(monkeypatch):
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    monkeypatch.setattr(lis, "_GROUPING_FRAME_CACHE", {})
+    df = pd.DataFrame(
+        {
+            "funder_name": ["A", "B", "A", "A", "B", "A"],
+            "grant_key": ["k1", "k2", "k3", "k4", "k5", "k6"],
+            "amount_usd": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+    frame = lis._grouping_frame(df)
+    assert isinstance(frame["funder_name"].dtype, pd.CategoricalDtype)
+    assert not isinstance(frame["grant_key"].dtype, pd.CategoricalDtype)
+    assert df["funder_name"].dtype == object
+    assert lis._grouping_frame(df) is frame
+
+    pivot = lis._df_pivot_table_tool(df, ["funder_name"], [], "amount_usd")
+    assert pivot.splitlines()[2:] == ["| A | 14 |", "| B | 7 |"]
+
+
+def test_tool_query_streams_final_answer_to_on_delta(monkeypatch):
+    from types import SimpleNamespace
+
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    call = SimpleNamespace(
+        id="call_1", function=SimpleNamespace(name="df_describe", arguments="{}")
+    )
+    deltas = ["B gave ", "$2 ", "in total" + "." * 40]
+
+    def _create(**kwargs):
+        if "tools" in kwargs:
+            msg = SimpleNamespace(content="", tool_calls=[call])
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+        assert kwargs.get("stream") is True
+        return iter(
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=d))])
+            for d in deltas
+        )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=_create)))
+    monkeypatch.setattr(lis, "get_openai_client", lambda: client)
+    monkeypatch.setattr(lis, "_TOOL_PLAN_CACHE", {})
+
+    seen = []
+    df = pd.DataFrame({"amount_usd": [1.0, 2.0]})
+    answer = lis.tool_query(df, "Who gave most?", pre_prompt="", on_delta=seen.append)
+    assert answer == "B gave \\$2 in total" + "." * 40
+    assert seen and seen[-1] == answer
+
+
+def test_dispatch_tool_reports_schema_violations():
+    import pandas as pd
+    import pytest
+
+    from loaders import llama_index_setup as lis
+
+    pytest.importorskip("jsonschema")
+    df = pd.DataFrame({"amount_usd": [1.0, 2.0]})
+    assert "'by' is a required property" in lis._dispatch_tool(df, "df_top_n", {"n": 3})
+    out = lis._dispatch_tool(df, "df_top_n", {"by": "amount_usd", "n": "ten"})
+    assert out.startswith("[df_top_n error] invalid n:")
+    assert "invalid arguments" in lis._dispatch_tool(df, "df_describe", ["amount_usd"])
+
+
+def test_filter_equals_and_in_tools_return_first_matches():
+    import pandas as pd
+
+    from loaders import llama_index_setup as lis
+
+    df = pd.DataFrame(
+        {
+            "funder_name": pd.array(["A", None, "B", "A", "A"], dtype="string"),
+            "amount_usd": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+    assert lis._df_filter_equals_tool(df, "funder_name", "A", limit=2).splitlines()[2:] == [
+        "| A | 1 |",
+        "| A | 4 |",
+    ]
+    rows = lis._df_filter_in_tool(df, "funder_name", ["B", "Z"]).splitlines()[2:]
+    assert rows == ["| B | 3 |"]
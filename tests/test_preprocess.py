@@ -6,3 +6,124 @@ def test_preprocess_sample():
     df, grouped_df = preprocess_data(grants)
     assert not df.empty
     assert not grouped_df.empty
+
+
+def test_preprocess_summary_scalars_in_attrs():
+    grants = load_data(file_path="data/sample.json")
+    df, _ = preprocess_data(grants)
+    assert "_total_amount" not in df.columns
+    assert df.attrs["grant_count"] == len(df)
+    assert df.attrs["total_amount"] == df["amount_usd"].sum()
+
+
+def test_load_data_from_uploaded_file_like():
+    import io
+
+    with open("data/sample.json", "rb") as f:
+        payload = f.read()
+    grants = load_data(uploaded_file=io.BytesIO(payload))
+    assert len(grants.grants) == len(load_data(file_path="data/sample.json").grants)
+
+
+def test_non_streaming_parse_with_and_without_orjson(monkeypatch):
+    import io
+
+    from loaders import data_loader
+
+    monkeypatch.setattr(data_loader, "ijson", None)
+    with open("data/sample.json", "rb") as f:
+        parsed = list(data_loader._iter_grant_items(f))
+    with open("data/sample.json", "rb") as f:
+        from_upload = list(data_loader._iter_grant_items(io.BytesIO(f.read())))
+    monkeypatch.setattr(data_loader, "orjson", None)
+    with open("data/sample.json", "rb") as f:
+        assert list(data_loader._iter_grant_items(f)) == parsed
+    assert parsed
+    assert from_upload == parsed
+
+
+def test_load_data_rejects_missing_grants_array(tmp_path):
+    import pytest
+
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"items": []}')
+    with pytest.raises(ValueError, match="'grants' array"):
+        load_data(file_path=str(bad))
+
+    empty = tmp_path / "empty.json"
+    empty.write_text('{"grants": []}')
+    assert load_data(file_path=str(empty)).grants == []
+
+
+def test_preprocess_pads_misaligned_code_tran_pairs():
+    import copy
+
+    grants = copy.deepcopy(load_data(file_path="data/sample.json"))
+    grants.grants = grants.grants[:1]
+    grant = grants.grants[0]
+    grant.grant_subject_code = "SJ01; SJ02"
+    grant.grant_subject_tran = "Arts"
+    grant.grant_population_code = " ; "
+    grant.grant_population_tran = ""
+
+    df, _ = preprocess_data(grants)
+
+    pairs = set(zip(df["grant_subject_code"], df["grant_subject_tran"], strict=False))
+    assert pairs == {("SJ01", "Arts"), ("SJ02", "Unknown")}
+    assert set(df["grant_population_code"]) == {"Unknown"}
+    assert set(df["grant_population_tran"]) == {"Unknown"}
+
+
+def test_preprocess_drops_source_duplicates_before_explode():
+    import copy
+
+    grants = copy.deepcopy(load_data(file_path="data/sample.json"))
+    grants.grants = grants.grants[:1]
+    single_df, _ = preprocess_data(grants)
+
+    duplicated = copy.deepcopy(grants)
+    duplicated.grants = duplicated.grants * 3
+    dup_df, _ = preprocess_data(duplicated)
+    assert len(dup_df) == len(single_df)
+
+
+def test_preprocess_parquet_cache_roundtrip(tmp_path, monkeypatch):
+    import pandas as pd
+    import pytest
+
+    from loaders import data_loader
+
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(data_loader, "_preprocess_cache_dir", lambda: str(tmp_path))
+
+    # Bypass st.cache_data so both calls exercise the on-disk cache
+    load = getattr(data_loader.load_data, "__wrapped__", data_loader.load_data)
+    preprocess = getattr(data_loader.preprocess_data, "__wrapped__", data_loader.preprocess_data)
+
+    grants = load(file_path="data/sample.json")
+    assert grants.source_hash
+    df, grouped_df = preprocess(grants)
+    assert len(list(tmp_path.glob("*.parquet"))) == 2
+
+    def _fail(_grants):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(data_loader, "_preprocess", _fail)
+    cached_df, cached_grouped = preprocess(grants)
+    pd.testing.assert_frame_equal(cached_df, df)
+    pd.testing.assert_frame_equal(cached_grouped, grouped_df)
+    assert cached_df.attrs == df.attrs
+
+
+def test_amount_clusters_match_pd_cut_edges():
+    import numpy as np
+    import pandas as pd
+
+    from loaders.data_loader import _amount_clusters
+
+    bins = [0, 50_000, 100_000, 500_000, 1_000_000, np.inf]
+    names = ["0-50k", "50k-100k", "100k-500k", "500k-1M", "1M+"]
+    amounts = np.array([-1.0, 0.0, 50_000.0, 50_000.5, 1_000_000.0, 5e9, np.nan])
+
+    expected = pd.cut(amounts, bins, labels=names, include_lowest=True)
+    pd.testing.assert_extension_array_equal(_amount_clusters(amounts, bins, names), expected)
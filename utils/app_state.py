@@ -79,12 +79,29 @@ def get_session_profile() -> UserProfile | None:
         return None
 
 
+def get_session_profile_version() -> int:
+    """Return a counter that changes whenever the session profile is replaced or cleared."""
+    try:
+        return int(st.session_state.get("user_profile_version", 0))
+    except Exception:
+        return 0
+
+
+def bump_session_profile_version() -> None:
+    """Mark the session profile as changed so profile-derived caches recompute."""
+    try:
+        st.session_state["user_profile_version"] = get_session_profile_version() + 1
+    except Exception:
+        pass
+
+
 def set_session_profile(profile: UserProfile) -> None:
     """Store user profile in session state."""
     try:
         st.session_state.user_profile = profile.to_dict()
     except Exception:
         pass  # Fail silently if session state unavailable
+    bump_session_profile_version()
 
 
 def init_session_state():
@@ -121,11 +138,12 @@ def sidebar_controls():
     except Exception:
         pass
 
+    # Profile drives page filtering, role selection and the reset button below
+    profile = get_session_profile()
+
     # Navigation dropdown (sidebar) — compact and navigates without callbacks
     try:
         st.sidebar.subheader("Navigate")
-        # Get profile to filter pages by experience level
-        profile = get_session_profile()
         experience_level = profile.experience_level if profile else "new"
 
         # Show profile summary when available (no feature flag required)
@@ -237,9 +255,8 @@ def sidebar_controls():
 
     # Determine selected_role based on profile if Newbie Mode is enabled
     # Determine selected_role based on profile when available (no feature flag required)
-    prof = get_session_profile()
-    if prof is not None:
-        selected_role = _map_experience_to_role(prof.experience_level)
+    if profile is not None:
+        selected_role = _map_experience_to_role(profile.experience_level)
     else:
         # Fallback to legacy selector if no profile yet
         user_roles = ["Grant Analyst/Writer", "Normal Grant User"]
@@ -286,15 +303,40 @@ def _load_and_preprocess(file_path: str | None, file_bytes):
     return preprocess_data(grants)
 
 
+_DATA_STATE_KEY = "_loaded_data_cache"
+
+
+def _data_source_id(uploaded_file) -> str | None:
+    """Identify the data source across reruns; None when an upload has no stable id."""
+    if uploaded_file is None:
+        return "sample"
+    file_id = getattr(uploaded_file, "file_id", None)
+    return f"upload:{file_id}" if file_id else None
+
+
 def get_data(uploaded_file):
+    # Reruns in a session reuse the frames they already loaded; going through
+    # st.cache_data again would re-hash the upload and unpickle a fresh copy each time
+    source_id = _data_source_id(uploaded_file)
+    try:
+        cached = st.session_state.get(_DATA_STATE_KEY)
+    except Exception:
+        cached = None
+    if source_id is not None and cached is not None and cached[0] == source_id:
+        return cached[1], cached[2], None
     try:
         if uploaded_file is not None:
             df, grouped_df = _load_and_preprocess(None, uploaded_file)
         else:
             df, grouped_df = _load_and_preprocess("data/sample.json", None)
-        return df, grouped_df, None
     except (OSError, ValueError, KeyError) as e:
         return None, None, str(e)
+    if source_id is not None:
+        try:
+            st.session_state[_DATA_STATE_KEY] = (source_id, df, grouped_df)
+        except Exception:
+            pass
+    return df, grouped_df, None
 
 
 def set_selected_chart(chart_id: str) -> None:
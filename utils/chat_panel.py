@@ -503,10 +503,18 @@ def chat_panel(df, pre_prompt: str, state_key: str, title: str = "AI Assistant")
                 st.rerun()
             else:
                 with st.spinner("Thinking…"):
+                    # Show the final answer as it streams in; the rerun below moves it to history
+                    live_answer = st.empty()
                     try:
                         preface = _audience_preface()
                         pre_prompt_eff = f"{preface}\n\n{pre_prompt}".strip()
-                        answer = tool_query(df, user_input, pre_prompt_eff, extra_ctx)
+                        answer = tool_query(
+                            df,
+                            user_input,
+                            pre_prompt_eff,
+                            extra_ctx,
+                            on_delta=live_answer.markdown,
+                        )
                     except (RuntimeError, ValueError, Exception) as e:
                         answer = f"Sorry, I couldn't process that: {e}"
                 st.session_state[history_key].append(("assistant", answer))
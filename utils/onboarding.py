@@ -11,7 +11,7 @@ from datetime import datetime
 
 import streamlit as st
 
-from utils.app_state import UserProfile, role_label
+from utils.app_state import UserProfile, bump_session_profile_version, role_label
 
 
 class OnboardingWizard:
@@ -306,3 +306,4 @@ class OnboardingWizard:
         for key in keys_to_reset:
             if key in st.session_state:
                 del st.session_state[key]
+        bump_session_profile_version()